@@ -7,22 +7,44 @@ and timeouts.
 
 Usage:
     python mock_api_server.py
+    
+    Runs under waitress when it is installed (pip install waitress), otherwise
+    under the threaded Flask development server.
 
 Author: War_RoomAI Team
 Version: 1.0.0
 """
 
 from flask import Flask, request, jsonify
+import math
+import numpy as np
 import random
 import time
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+
+def _json_response(obj, status=200):
+    """Serialize a response body with orjson when available, else Flask's jsonify."""
+    if orjson is not None:
+        try:
+            return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+        except orjson.JSONEncodeError:
+            # e.g. ints beyond 64 bits, which jsonify still encodes
+            pass
+    return jsonify(obj), status
+
+
 # Mock recommendations database
 MOCK_RECOMMENDATIONS = {
     'api': [
@@ -45,6 +67,26 @@ MOCK_RECOMMENDATIONS = {
     ]
 }
 
+# Severity buckets: anomaly counts below 2, 2-4, 5-9 and 10+ map to
+# recommendation indexes 3, 2, 1 and 0 (index 0 is the high-severity advice)
+BUCKET_EDGES = np.array([2, 5, 10])
+BUCKET_TO_INDEX = np.array([3, 2, 1, 0])
+BUCKET_TO_SEVERITY = ('low', 'low', 'medium', 'high')
+
+def _anomaly_count(value):
+    """
+    Return the anomaly count if it is a finite number, else None.
+    
+    Bools are accepted as numbers, as they always were. NaN and infinity are
+    rejected because they cannot be echoed back in a JSON response. Counts
+    above the top bucket edge all map to the same bucket, so they are clamped
+    to it, which keeps very large ints within float range.
+    """
+    if not isinstance(value, (int, float)) or (isinstance(value, float) and not math.isfinite(value)):
+        return None
+    return min(value, BUCKET_EDGES[-1])
+
+
 # Simulate API behavior modes
 API_MODE = 'normal'  # 'normal', 'slow', 'error', 'timeout'
 
@@ -52,7 +94,7 @@ API_MODE = 'normal'  # 'normal', 'slow', 'error', 'timeout'
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'timestamp': time.time()})
+    return _json_response({'status': 'healthy', 'timestamp': time.time()})
 
 
 @app.route('/api/v1/recommendations', methods=['POST'])
@@ -62,7 +104,7 @@ def get_recommendation():
         data = request.get_json()
         
         if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
+            return _json_response({'error': 'No JSON data provided'}, 400)
         
         service = data.get('service')
         anomaly_count = data.get('anomaly_count', 0)
@@ -77,41 +119,39 @@ def get_recommendation():
         elif API_MODE == 'timeout':
             time.sleep(15)  # Simulate timeout
         elif API_MODE == 'error':
-            return jsonify({'error': 'Internal server error'}), 500
+            return _json_response({'error': 'Internal server error'}, 500)
         
         if not service:
-            return jsonify({'error': 'Service name is required'}), 400
+            return _json_response({'error': 'Service name is required'}, 400)
         
         # Get recommendation based on service and anomaly count
         if service in MOCK_RECOMMENDATIONS:
             recommendations = MOCK_RECOMMENDATIONS[service]
             
+            count = _anomaly_count(anomaly_count)
+            if count is None:
+                return _json_response({'error': f'anomaly_count must be a finite number, got {anomaly_count!r}'}, 400)
+            
             # Select recommendation based on anomaly count
-            if anomaly_count >= 10:
-                recommendation = recommendations[0]  # High severity
-            elif anomaly_count >= 5:
-                recommendation = recommendations[1]  # Medium severity
-            elif anomaly_count >= 2:
-                recommendation = recommendations[2]  # Low severity
-            else:
-                recommendation = recommendations[3]  # Very low severity
+            bucket = int(np.searchsorted(BUCKET_EDGES, count, side='right'))
+            recommendation = recommendations[BUCKET_TO_INDEX[bucket]]
             
             # Add contextual information
             if metric_name and metric_value:
                 recommendation += f" (Detected {metric_name}: {metric_value})"
             
-            return jsonify({
+            return _json_response({
                 'recommendation': recommendation,
                 'service': service,
                 'anomaly_count': anomaly_count,
-                'severity': 'high' if anomaly_count >= 10 else 'medium' if anomaly_count >= 5 else 'low'
+                'severity': BUCKET_TO_SEVERITY[bucket]
             })
         else:
-            return jsonify({'error': f'Unknown service: {service}'}), 404
+            return _json_response({'error': f'Unknown service: {service}'}, 404)
             
     except Exception as e:
         logger.error(f"Error processing recommendation request: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _json_response({'error': 'Internal server error'}, 500)
 
 
 @app.route('/api/v1/recommendations/bulk', methods=['POST'])
@@ -121,12 +161,12 @@ def get_bulk_recommendations():
         data = request.get_json()
         
         if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
+            return _json_response({'error': 'No JSON data provided'}, 400)
         
         services = data.get('services', [])
         
         if not services:
-            return jsonify({'error': 'Services list is required'}), 400
+            return _json_response({'error': 'Services list is required'}, 400)
         
         logger.info(f"Received bulk recommendation request for {len(services)} services")
         
@@ -136,36 +176,41 @@ def get_bulk_recommendations():
         elif API_MODE == 'timeout':
             time.sleep(15)  # Simulate timeout
         elif API_MODE == 'error':
-            return jsonify({'error': 'Internal server error'}), 500
+            return _json_response({'error': 'Internal server error'}, 500)
         
         recommendations = {}
         
+        # Unknown services and services with a non-numeric count are skipped
+        # one by one, so a bad entry does not fail the rest of the batch
+        known = []
         for service_data in services:
             service = service_data.get('service')
-            anomaly_count = service_data.get('anomaly_count', 0)
+            if service not in MOCK_RECOMMENDATIONS:
+                continue
+            count = _anomaly_count(service_data.get('anomaly_count', 0))
+            if count is None:
+                logger.warning(f"Skipping service {service}: invalid anomaly_count {service_data.get('anomaly_count')!r}")
+                continue
+            known.append((service_data, count))
+        
+        # Select recommendation indexes for all remaining services at once
+        counts = np.array([count for _, count in known], dtype=np.float64)
+        indexes = BUCKET_TO_INDEX[np.searchsorted(BUCKET_EDGES, counts, side='right')]
+        
+        for (service_data, _), index in zip(known, indexes.tolist()):
+            service = service_data['service']
             metric_name = service_data.get('metric_name')
             metric_value = service_data.get('metric_value')
             
-            if service in MOCK_RECOMMENDATIONS:
-                service_recommendations = MOCK_RECOMMENDATIONS[service]
-                
-                # Select recommendation based on anomaly count
-                if anomaly_count >= 10:
-                    recommendation = service_recommendations[0]
-                elif anomaly_count >= 5:
-                    recommendation = service_recommendations[1]
-                elif anomaly_count >= 2:
-                    recommendation = service_recommendations[2]
-                else:
-                    recommendation = service_recommendations[3]
-                
-                # Add contextual information
-                if metric_name and metric_value:
-                    recommendation += f" (Detected {metric_name}: {metric_value})"
-                
-                recommendations[service] = recommendation
-        
-        return jsonify({
+            recommendation = MOCK_RECOMMENDATIONS[service][index]
+            
+            # Add contextual information
+            if metric_name and metric_value:
+                recommendation += f" (Detected {metric_name}: {metric_value})"
+            
+            recommendations[service] = recommendation
+        
+        return _json_response({
             'recommendations': recommendations,
             'total_services': len(services),
             'processed_services': len(recommendations)
@@ -173,7 +218,7 @@ def get_bulk_recommendations():
         
     except Exception as e:
         logger.error(f"Error processing bulk recommendation request: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _json_response({'error': 'Internal server error'}, 500)
 
 
 @app.route('/api/mode', methods=['POST'])
@@ -187,15 +232,15 @@ def set_api_mode():
     if mode in ['normal', 'slow', 'error', 'timeout']:
         API_MODE = mode
         logger.info(f"API mode set to: {mode}")
-        return jsonify({'mode': API_MODE, 'message': f'API mode set to {mode}'})
+        return _json_response({'mode': API_MODE, 'message': f'API mode set to {mode}'})
     else:
-        return jsonify({'error': 'Invalid mode. Use: normal, slow, error, timeout'}), 400
+        return _json_response({'error': 'Invalid mode. Use: normal, slow, error, timeout'}, 400)
 
 
 @app.route('/api/mode', methods=['GET'])
 def get_api_mode():
     """Get current API behavior mode."""
-    return jsonify({'mode': API_MODE})
+    return _json_response({'mode': API_MODE})
 
 
 if __name__ == '__main__':
@@ -213,5 +258,13 @@ if __name__ == '__main__':
     print("  timeout - Simulate timeouts")
     print("\nStarting server on http://localhost:5000")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Serve with waitress (multi-threaded WSGI) so load tests are not
+    # bottlenecked by the Werkzeug debug server and its reloader
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress not installed - falling back to the Flask development server")
+        app.run(host='0.0.0.0', port=5000, threaded=True)
+    else:
+        serve(app, host='0.0.0.0', port=5000, threads=16)
 
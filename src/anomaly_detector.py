@@ -12,19 +12,44 @@ Version: 1.0.0
 import pandas as pd
 import logging
 from typing import List, Dict, Any
-from config import thresholds, get_threshold
+from config import thresholds
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
 
+def _threshold_frame() -> pd.DataFrame:
+    """
+    Flatten the configured thresholds into a (metric_name, service, threshold) table.
+    
+    Metrics with a single scalar threshold get a service of None, meaning the
+    threshold applies to every service.
+    
+    Returns:
+        pd.DataFrame: One row per configured threshold
+    """
+    thr_rows = [
+        (metric, service, value)
+        for metric, threshold in thresholds.items()
+        for service, value in (threshold.items() if isinstance(threshold, dict) else [(None, threshold)])
+    ]
+    return pd.DataFrame(thr_rows, columns=['metric_name', 'service', 'threshold'])
+
+
+# Threshold table flattened once at import. Per-service thresholds are joined
+# on (metric_name, service); scalar thresholds on metric_name alone
+_THRESHOLD_TABLE = _threshold_frame()
+_SERVICE_THRESHOLDS = _THRESHOLD_TABLE[_THRESHOLD_TABLE['service'].notna()]
+_SCALAR_THRESHOLDS = _THRESHOLD_TABLE[_THRESHOLD_TABLE['service'].isna()].drop(columns='service')
+
+
 def metric_anomaly(df: pd.DataFrame) -> pd.DataFrame:
     """
     Detect metric anomalies by comparing values against configured thresholds.
     
-    This function iterates through all metric records and identifies those
-    that exceed the configured threshold values for their respective metrics
-    and services.
+    This function joins all metric records against the configured threshold
+    table and identifies those that exceed the threshold values for their
+    respective metrics and services.
     
     Args:
         df: DataFrame containing metric data with columns:
@@ -62,48 +87,26 @@ def metric_anomaly(df: pd.DataFrame) -> pd.DataFrame:
     
     logger.info(f"Analyzing {len(df)} metric records for anomalies")
     
-    anomalies = []
-    processed_count = 0
-    error_count = 0
-    
     try:
-        for index, row in df.iterrows():
-            try:
-                metric = row['metric_name']
-                value = row['value']
-                service = row['service']
-                
-                # Skip if any required field is null/NaN
-                if pd.isna(metric) or pd.isna(value) or pd.isna(service):
-                    logger.debug(f"Skipping row {index}: missing required data")
-                    continue
-                
-                # Get threshold for this metric and service
-                threshold_value = get_threshold(metric, service)
-                
-                if threshold_value is None:
-                    logger.debug(f"No threshold configured for metric '{metric}' and service '{service}'")
-                    continue
-                
-                # Check if value exceeds threshold
-                if value > threshold_value:
-                    logger.debug(f"Anomaly detected: {service}.{metric} = {value} > {threshold_value}")
-                    anomalies.append(row)
-                
-                processed_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                logger.warning(f"Error processing row {index}: {str(e)}")
-                continue
+        # Skip rows where any required field is null/NaN
+        complete_df = df.dropna(subset=required_columns)
+        if len(complete_df) < len(df):
+            logger.debug(f"Skipping {len(df) - len(complete_df)} rows with missing required data")
+        df = complete_df
         
-        # Convert anomalies list to DataFrame
-        anomalies_df = pd.DataFrame(anomalies) if anomalies else pd.DataFrame(columns=required_columns)
+        # Align a threshold to every row with a join against the flattened
+        # threshold table instead of looking each row up in Python
+        threshold = _lookup_thresholds(df)
+        processed_count = int(threshold.notna().sum())
         
-        logger.info(f"Metric anomaly detection completed: {len(anomalies_df)} anomalies found from {processed_count} processed records")
+        # Check if value exceeds threshold (NaN thresholds compare False).
+        # Both sides as contiguous float64 arrays so NumPy runs one
+        # vectorized compare, whatever dtype backend the loader produced
+        values = df['value'].to_numpy(dtype='float64')
+        mask = values > threshold.to_numpy(dtype='float64')
+        anomalies_df = df[mask]
         
-        if error_count > 0:
-            logger.warning(f"Encountered {error_count} errors during processing")
+        logger.info(f"Metric anomaly detection completed: {len(anomalies_df)} anomalies found from {processed_count} processed records")
         
         return anomalies_df
         
@@ -113,6 +116,26 @@ def metric_anomaly(df: pd.DataFrame) -> pd.DataFrame:
         raise
 
 
+def _lookup_thresholds(df: pd.DataFrame) -> pd.Series:
+    """
+    Look up the configured threshold for every metric row.
+    
+    Args:
+        df: DataFrame with 'metric_name' and 'service' columns
+        
+    Returns:
+        pd.Series: Threshold per row (positionally aligned with df), NaN where
+        no threshold is configured
+    """
+    keys = df[['metric_name', 'service']].reset_index(drop=True)
+    
+    # Left joins against unique keys keep the row count and order of df
+    threshold = keys.merge(_SERVICE_THRESHOLDS, on=['metric_name', 'service'], how='left')['threshold']
+    scalar_threshold = keys[['metric_name']].merge(_SCALAR_THRESHOLDS, on='metric_name', how='left')['threshold']
+    
+    return threshold.fillna(scalar_threshold).astype('float64')
+
+
 def log_warn(df: pd.DataFrame) -> pd.DataFrame:
     """
     Extract warning-level log entries from log data.
@@ -157,8 +180,12 @@ def log_warn(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(f"Analyzing {len(df)} log records for warnings")
     
     try:
-        # Filter for WARNING level logs (case-insensitive)
-        warn_logs = df[df['level'].str.contains('WARN', case=False, na=False)]
+        # Filter for WARNING level logs (case-insensitive). Levels are a small
+        # vocabulary, so normalize the categories once and compare codes
+        levels = df['level'].astype('category')
+        warn_levels = [level for level in levels.cat.categories
+                       if str(level).strip().upper() in ('WARN', 'WARNING')]
+        warn_logs = df[levels.isin(warn_levels)]
         
         logger.info(f"Found {len(warn_logs)} warning-level log entries")
         
@@ -191,12 +218,18 @@ def get_anomaly_summary(anomalies_df: pd.DataFrame) -> Dict[str, Any]:
         }
     
     try:
+        # One pass over the frame; per-service and per-metric counts are
+        # rolled up from the (service, metric_name) group sizes
+        counts = anomalies_df.groupby(['service', 'metric_name'], sort=False, dropna=False).size()
+        by_service = counts.groupby(level=0, sort=False).sum()
+        by_metric = counts.groupby(level=1, sort=False).sum()
+        
         summary = {
             'total_anomalies': len(anomalies_df),
-            'services_affected': anomalies_df['service'].unique().tolist(),
-            'metrics_affected': anomalies_df['metric_name'].unique().tolist(),
-            'anomaly_by_service': anomalies_df['service'].value_counts().to_dict(),
-            'anomaly_by_metric': anomalies_df['metric_name'].value_counts().to_dict()
+            'services_affected': by_service.index.tolist(),
+            'metrics_affected': by_metric.index.tolist(),
+            'anomaly_by_service': by_service.sort_values(ascending=False, kind='stable').to_dict(),
+            'anomaly_by_metric': by_metric.sort_values(ascending=False, kind='stable').to_dict()
         }
         
         logger.info(f"Anomaly summary: {summary['total_anomalies']} total anomalies across {len(summary['services_affected'])} services")
@@ -10,20 +10,210 @@ Version: 1.0.0
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import logging
+import random
 import time
-from typing import Dict, Any, Optional, List
-from config import API_CONFIG, API_HEADERS, LLM_CONFIG
+import threading
+from email.utils import parsedate_to_datetime
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Hashable
+from config import API_CONFIG, API_HEADERS, LLM_CONFIG, get_recommendation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
+# LLM-only mode is fixed at import, so the hot path checks one module global
+# instead of looking the flag up in LLM_CONFIG on every call
+_LLM_ONLY = bool(LLM_CONFIG.get('llm_only'))
+
+
+def _json_loads(content: bytes) -> Any:
+    """Parse a JSON response body straight from bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize a JSON request body to bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
 
 class APIError(Exception):
     """Custom exception for API-related errors."""
     pass
 
 
+class _TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after a time-to-live.
+    
+    Negative results (None) are kept for a shorter TTL so a failing backend is
+    not hammered, but recovers quickly once it is healthy again.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value) for key; expired entries count as a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full."""
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class _SimilarContextCache:
+    """
+    Per-service memory of recent LLM responses, looked up by nearest metric value.
+    
+    A context matches a stored response when it names the same service and
+    metric and its metric value lies within a relative tolerance of the stored
+    one (e.g. api latency 352ms vs 358ms), so near-duplicate anomalies reuse
+    the remediation instead of issuing another LLM call. At most maxsize
+    responses are kept in total; when full, the least recently used service is
+    evicted as a whole.
+    """
+    
+    def __init__(self, ttl: float, tolerance: float, maxsize: int = 1024, per_service: int = 64):
+        self.ttl = ttl
+        self.tolerance = tolerance
+        self.maxsize = maxsize
+        self.per_service = min(per_service, maxsize)
+        self._entries: 'OrderedDict[Any, List[Tuple[float, Any, Optional[float], str]]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def _matches(self, entry_value: Optional[float], value: Optional[float]) -> bool:
+        if entry_value is None or value is None:
+            return entry_value is value
+        return abs(entry_value - value) <= self.tolerance * max(abs(entry_value), abs(value), 1.0)
+    
+    def get(self, context: Dict[str, Any]) -> Optional[str]:
+        """Return the closest fresh response for a similar context, if any."""
+        if self.ttl <= 0:
+            return None
+        service = context.get('service')
+        value = context.get('metric_value')
+        value = float(value) if value is not None else None
+        now = time.monotonic()
+        best, best_distance = None, None
+        with self._lock:
+            stored = self._entries.get(service)
+            if stored is None:
+                return None
+            entries = [e for e in stored if now - e[0] < self.ttl]
+            self._size -= len(stored) - len(entries)
+            if not entries:
+                del self._entries[service]
+                return None
+            self._entries[service] = entries
+            self._entries.move_to_end(service)
+            for _, metric_name, entry_value, response in entries:
+                if metric_name != context.get('metric_name') or not self._matches(entry_value, value):
+                    continue
+                distance = abs(entry_value - value) if value is not None else 0.0
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = response, distance
+        return best
+    
+    def add(self, context: Dict[str, Any], response: str) -> None:
+        """Remember a response for its context, keeping the newest entries per service."""
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        service = context.get('service')
+        value = context.get('metric_value')
+        entry = (time.monotonic(), context.get('metric_name'), float(value) if value is not None else None, response)
+        with self._lock:
+            entries = self._entries.setdefault(service, [])
+            entries.append(entry)
+            self._size += 1
+            if len(entries) > self.per_service:
+                self._size -= len(entries) - self.per_service
+                del entries[:-self.per_service]
+            self._entries.move_to_end(service)
+            while self._size > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class _CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for the recommendations API.
+    
+    After fail_threshold failed calls in a row the circuit opens and calls
+    fail fast for open_seconds. Once the window has elapsed a single probe
+    call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+    
+    def __init__(self, fail_threshold: int, open_seconds: float):
+        self.fail_threshold = fail_threshold
+        self.open_seconds = open_seconds
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def is_open(self) -> bool:
+        """Return True while calls are being short-circuited."""
+        return (self.failures >= self.fail_threshold
+                and time.monotonic() - self.opened_at < self.open_seconds)
+    
+    def allow(self) -> bool:
+        """Return True if a call may go out, admitting one probe per open window."""
+        with self._lock:
+            if self.failures < self.fail_threshold:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.open_seconds:
+                return False
+            # Half-open: re-arm the window so concurrent callers keep failing
+            # fast while this probe is in flight
+            self.opened_at = now
+            return True
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.fail_threshold:
+                self.opened_at = time.monotonic()
+
+
 class RecommendationsAPI:
     """
     API client for fetching service recommendations.
@@ -39,9 +229,24 @@ class RecommendationsAPI:
         self.timeout = API_CONFIG['timeout']
         self.retry_attempts = API_CONFIG['retry_attempts']
         self.retry_delay = API_CONFIG['retry_delay']
+        self.retry_cap = API_CONFIG.get('retry_cap', 10)
+        self._url = f"{self.base_url}{self.endpoint}"
+        self._bulk_url = f"{self._url}/bulk"
         self.fallback_enabled = API_CONFIG['fallback_enabled']
         self.headers = API_HEADERS.copy()
         
+        # Pooled session so repeated calls reuse keep-alive connections
+        # instead of paying a TCP/TLS handshake per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=API_CONFIG.get('pool_connections', 10),
+            pool_maxsize=API_CONFIG.get('pool_maxsize', 32),
+            pool_block=False
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         # Add authentication headers if configured
         # if API_AUTH:
         #     if API_AUTH['auth_type'] == 'bearer':
@@ -51,10 +256,69 @@ class RecommendationsAPI:
         
         logger.info(f"Initialized RecommendationsAPI with base URL: {self.base_url}")
     
+    @staticmethod
+    def _retry_after_seconds(response: Optional[requests.Response]) -> Optional[float]:
+        """
+        Parse a Retry-After header (delay in seconds or an HTTP date).
+        
+        Returns:
+            float: Seconds to wait, or None if the header is absent or invalid
+        """
+        if response is None:
+            return None
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the wait before the next attempt: capped exponential backoff
+        with full jitter, never shorter than a server-provided Retry-After.
+        Retry-After is itself clamped to retry_cap, so a far-off value (e.g.
+        3600 or a distant HTTP date) cannot stall the caller.
+        """
+        delay = random.uniform(0, min(self.retry_cap, self.retry_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_cap))
+        return delay
+    
+    def _attempt(self, method: str, url: str, **kwargs) -> Tuple[Optional[requests.Response], Optional[str], bool]:
+        """
+        Send a single request and classify the outcome from its status code.
+        
+        Returns:
+            Tuple of (response, error, retryable). error is None on success
+            (status < 400); retryable is False for client errors (4xx other
+            than 429). response is None when no response was received.
+        """
+        try:
+            response = self.session.request(method=method, url=url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            return None, str(e), True
+        
+        status = response.status_code
+        if status < 400:
+            return response, None, False
+        
+        error = f"{status} {response.reason} for url: {url}"
+        return response, error, status >= 500 or status == 429
+    
     def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
         """
         Make HTTP request with retry logic and error handling.
         
+        Network errors, 429 and 5xx responses are retried with exponential
+        backoff and jitter. Client errors (other 4xx) are not retried. While
+        the circuit breaker is open the request is not attempted at all.
+        
         Args:
             method: HTTP method (GET, POST, etc.)
             url: Full URL for the request
@@ -64,55 +328,41 @@ class RecommendationsAPI:
             requests.Response: Response object
             
         Raises:
-            APIError: If all retry attempts fail
+            APIError: If all retry attempts fail or the circuit is open
         """
-        last_exception = None
+        # Fail fast while the backend is known to be down
+        if not _api_breaker.allow():
+            error_msg = "Circuit open - skipping request to recommendations API"
+            logger.warning(error_msg)
+            raise APIError(error_msg)
         
-        for attempt in range(self.retry_attempts + 1):
-            try:
-                logger.debug(f"Making {method} request to {url} (attempt {attempt + 1}/{self.retry_attempts + 1})")
-                
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    timeout=self.timeout,
-                    **kwargs
-                )
-                
-                # Check for HTTP errors
-                response.raise_for_status()
-                
-                logger.debug(f"Request successful: {response.status_code}")
+        total_attempts = self.retry_attempts + 1
+        for attempt in range(total_attempts):
+            logger.debug("Making %s request to %s (attempt %d/%d)", method, url, attempt + 1, total_attempts)
+            response, error, retryable = self._attempt(method, url, **kwargs)
+            
+            if error is None:
+                logger.debug("Request successful: %s", response.status_code)
+                _api_breaker.record_success()
                 return response
-                
-            except requests.exceptions.Timeout as e:
-                last_exception = e
-                logger.warning(f"Request timeout on attempt {attempt + 1}: {str(e)}")
-                
-            except requests.exceptions.ConnectionError as e:
-                last_exception = e
-                logger.warning(f"Connection error on attempt {attempt + 1}: {str(e)}")
-                
-            except requests.exceptions.HTTPError as e:
-                last_exception = e
-                logger.warning(f"HTTP error on attempt {attempt + 1}: {str(e)}")
-                
-            except requests.exceptions.RequestException as e:
-                last_exception = e
-                logger.warning(f"Request error on attempt {attempt + 1}: {str(e)}")
-                
-            except Exception as e:
-                last_exception = e
-                logger.error(f"Unexpected error on attempt {attempt + 1}: {str(e)}")
+            
+            logger.warning("Request failed on attempt %d: %s", attempt + 1, error)
+            if not retryable:
+                # Client errors will not succeed on retry, but prove the API is up
+                _api_breaker.record_success()
+                error_msg = f"Request failed with client error: {error}"
+                logger.error(error_msg)
+                raise APIError(error_msg)
             
             # Wait before retry (except on last attempt)
             if attempt < self.retry_attempts:
-                logger.info(f"Retrying in {self.retry_delay} seconds...")
-                time.sleep(self.retry_delay)
+                delay = self._backoff_delay(attempt, self._retry_after_seconds(response))
+                logger.info("Retrying in %.2f seconds...", delay)
+                time.sleep(delay)
         
         # All retries failed
-        error_msg = f"All {self.retry_attempts + 1} attempts failed. Last error: {str(last_exception)}"
+        _api_breaker.record_failure()
+        error_msg = f"All {total_attempts} attempts failed. Last error: {error}"
         logger.error(error_msg)
         raise APIError(error_msg)
     
@@ -146,17 +396,14 @@ class RecommendationsAPI:
             if metric_value is not None:
                 request_data['metric_value'] = metric_value
             
-            # Construct full URL
-            url = f"{self.base_url}{self.endpoint}"
-            
             logger.info(f"Fetching recommendation for service '{service}' with {anomaly_count} anomalies")
             
             # Make API request
-            response = self._make_request('POST', url, json=request_data)
+            response = self._make_request('POST', self._url, json=request_data)
             
             # Parse response
             try:
-                response_data = response.json()
+                response_data = _json_loads(response.content)
                 
                 if 'recommendation' in response_data:
                     recommendation = response_data['recommendation']
@@ -178,6 +425,81 @@ class RecommendationsAPI:
             
             logger.info("Fallback enabled - will use local recommendations")
             return None
+    
+    def get_bulk_recommendations(self, services_data: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Fetch recommendations for multiple services in a single API call.
+        
+        Args:
+            services_data: List of dictionaries containing service information
+            
+        Returns:
+            Dict mapping service names to recommendations
+        """
+        try:
+            logger.info(f"Fetching bulk recommendations for {len(services_data)} services")
+            
+            response = self._make_request('POST', self._bulk_url, json={'services': services_data})
+            
+            try:
+                response_data = _json_loads(response.content)
+                
+                if 'recommendations' in response_data:
+                    recommendations = response_data['recommendations']
+                    logger.info(f"Successfully fetched {len(recommendations)} bulk recommendations")
+                    return recommendations
+                else:
+                    logger.warning(f"API response missing 'recommendations' field: {response_data}")
+                    return {}
+                    
+            except ValueError as e:
+                logger.error(f"Failed to parse JSON response: {str(e)}")
+                return {}
+                
+        except APIError as e:
+            logger.error(f"Bulk API call failed: {str(e)}")
+            
+            if not self.fallback_enabled:
+                raise
+            
+            logger.info("Fallback enabled - will use local recommendations")
+            return {}
+    
+    def health_check(self) -> bool:
+        """
+        Check if the API is available and responding.
+        
+        Returns:
+            bool: True if API is healthy, False otherwise
+        """
+        try:
+            url = f"{self.base_url}/health"
+            response = self._make_request('GET', url)
+            
+            if response.status_code == 200:
+                logger.info("API health check passed")
+                return True
+            else:
+                logger.warning(f"API health check failed with status: {response.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.warning(f"API health check failed: {str(e)}")
+            return False
+
+
+# Invariant system prompt for LLM recommendations
+_LLM_SYSTEM_PROMPT = (
+    "You are an expert SRE assistant. Given service anomalies, logs, and metrics, "
+    "produce one concise, actionable remediation recommendation (1-2 sentences). "
+    "Avoid generic advice; be specific based on context."
+)
+
+# System prompt for batched requests: one JSON object covering every service
+_LLM_BULK_SYSTEM_PROMPT = (
+    _LLM_SYSTEM_PROMPT + " You will be given several services. Respond only with a JSON object "
+    "mapping each service name to its recommendation."
+)
 
 
 class LLMProvider:
@@ -194,6 +516,31 @@ class LLMProvider:
         self.model: str = str(LLM_CONFIG.get('model') or 'gpt-4o-mini')
         self.timeout: float = float(LLM_CONFIG.get('timeout') or 12)
         self.max_tokens: int = int(LLM_CONFIG.get('max_tokens') or 300)
+        self.max_bulk_tokens: int = int(LLM_CONFIG.get('max_bulk_tokens') or 4096)
+        self.max_concurrency: int = int(LLM_CONFIG.get('max_concurrency') or 8)
+
+        # Request pieces that never change between calls are built once here;
+        # recommend() only adds the per-context user message
+        self._url = f"{self.api_base}/v1/chat/completions"
+        self._headers = {
+            'Authorization': f"Bearer {self.api_key}",
+            'Content-Type': 'application/json'
+        }
+        self._system_msg = {'role': 'system', 'content': _LLM_SYSTEM_PROMPT}
+        self._bulk_system_msg = {'role': 'system', 'content': _LLM_BULK_SYSTEM_PROMPT}
+        self._payload_template = {
+            'model': self.model,
+            'messages': None,
+            'temperature': 0.2,
+            'max_tokens': self.max_tokens
+        }
+
+        # Reused across recommend() calls so the connection to the LLM API stays
+        # warm; the pool is sized so concurrent bulk calls each keep a connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(16, self.max_concurrency))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
         if not self.enabled or not self.api_key:
             logger.info("LLM provider disabled or missing API key; skipping LLM recommendations")
@@ -207,18 +554,11 @@ class LLMProvider:
             return None
 
         try:
-            import requests
+            cached = _llm_response_cache.get(context)
+            if cached:
+                logger.info(f"Reusing LLM recommendation from a similar {context.get('service')} context")
+                return cached
 
-            url = f"{self.api_base}/v1/chat/completions"
-            headers = {
-                'Authorization': f"Bearer {self.api_key}",
-                'Content-Type': 'application/json'
-            }
-            system_prompt = (
-                "You are an expert SRE assistant. Given service anomalies, logs, and metrics, "
-                "produce one concise, actionable remediation recommendation (1-2 sentences). "
-                "Avoid generic advice; be specific based on context."
-            )
             user_prompt = (
                 f"Service: {context.get('service')}\n"
                 f"Anomaly count: {context.get('anomaly_count')}\n"
@@ -227,20 +567,14 @@ class LLMProvider:
                 f"Recent log message: {context.get('log_message') or 'N/A'}\n"
                 f"Correlations: {context.get('correlations') or []}"
             )
-
             payload = {
-                'model': self.model,
-                'messages': [
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                'temperature': 0.2,
-                'max_tokens': self.max_tokens
+                **self._payload_template,
+                'messages': [self._system_msg, {'role': 'user', 'content': user_prompt}]
             }
 
-            resp = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+            resp = self.session.post(self._url, data=_json_dumps(payload), headers=self._headers, timeout=self.timeout)
             resp.raise_for_status()
-            data = resp.json()
+            data = _json_loads(resp.content)
             content = (
                 data.get('choices', [{}])[0]
                     .get('message', {})
@@ -249,95 +583,208 @@ class LLMProvider:
             if not content:
                 logger.warning("LLM response missing content")
                 return None
-            return content.strip()
+            content = content.strip()
+            _llm_response_cache.add(context, content)
+            return content
         except Exception as e:
             logger.warning(f"LLM recommendation failed: {str(e)}")
             return None
     
-    def get_bulk_recommendations(self, services_data: List[Dict[str, Any]]) -> Dict[str, str]:
+    def recommend_bulk(self, contexts: List[Dict[str, Any]]) -> Dict[str, str]:
         """
-        Fetch recommendations for multiple services in a single API call.
-        
-        Args:
-            services_data: List of dictionaries containing service information
-            
-        Returns:
-            Dict mapping service names to recommendations
+        Generate recommendations for several services in a single LLM call.
+        The services are enumerated in one prompt and the model answers in JSON
+        mode with a {service: recommendation} object, so N services cost one
+        round-trip and one copy of the system prompt. Services are split into
+        batches so no call asks for more than max_bulk_tokens of completion.
+        Returns the parsed mapping, or {} if disabled or every call/parse failed.
         """
-        try:
-            url = f"{self.base_url}{self.endpoint}/bulk"
-            
-            logger.info(f"Fetching bulk recommendations for {len(services_data)} services")
-            
-            response = self._make_request('POST', url, json={'services': services_data})
-            
-            try:
-                response_data = response.json()
-                
-                if 'recommendations' in response_data:
-                    recommendations = response_data['recommendations']
-                    logger.info(f"Successfully fetched {len(recommendations)} bulk recommendations")
-                    return recommendations
-                else:
-                    logger.warning(f"API response missing 'recommendations' field: {response_data}")
-                    return {}
-                    
-            except ValueError as e:
-                logger.error(f"Failed to parse JSON response: {str(e)}")
-                return {}
-                
-        except APIError as e:
-            logger.error(f"Bulk API call failed: {str(e)}")
-            
-            if not self.fallback_enabled:
-                raise
-            
-            logger.info("Fallback enabled - will use local recommendations")
+        if not contexts or not self.enabled or not self.api_key:
             return {}
-    
-    def health_check(self) -> bool:
+
+        results: Dict[str, str] = {}
+        pending = []
+        for context in contexts:
+            try:
+                cached = _llm_response_cache.get(context)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed for {context.get('service')}: {str(e)}")
+                cached = None
+            if cached:
+                results[context.get('service')] = cached
+            else:
+                pending.append(context)
+
+        batch_size = max(1, self.max_bulk_tokens // self.max_tokens)
+        for start in range(0, len(pending), batch_size):
+            results.update(self._recommend_batch(pending[start:start + batch_size]))
+        return results
+
+    def _recommend_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, str]:
         """
-        Check if the API is available and responding.
-        
-        Returns:
-            bool: True if API is healthy, False otherwise
+        Run one bulk LLM call for a batch of uncached contexts.
+        Returns the parsed mapping, or {} if the call/parse failed.
         """
+        results: Dict[str, str] = {}
         try:
-            url = f"{self.base_url}/health"
-            response = self._make_request('GET', url)
-            
-            if response.status_code == 200:
-                logger.info("API health check passed")
-                return True
-            else:
-                logger.warning(f"API health check failed with status: {response.status_code}")
-                return False
-                
+            lines = [
+                f"{i}. service={c.get('service')}, anomaly_count={c.get('anomaly_count')}, "
+                f"metric_name={c.get('metric_name')}, metric_value={c.get('metric_value')}, "
+                f"log_message={c.get('log_message') or 'N/A'}"
+                for i, c in enumerate(batch, 1)
+            ]
+            payload = {
+                **self._payload_template,
+                'messages': [self._bulk_system_msg, {'role': 'user', 'content': "\n".join(lines)}],
+                'max_tokens': min(self.max_tokens * len(batch), self.max_bulk_tokens),
+                'response_format': {'type': 'json_object'}
+            }
+
+            resp = self.session.post(self._url, data=_json_dumps(payload), headers=self._headers, timeout=self.timeout)
+            resp.raise_for_status()
+            data = _json_loads(resp.content)
+            content = (
+                data.get('choices', [{}])[0]
+                    .get('message', {})
+                    .get('content')
+            )
+            recs = _json_loads(content) if content else None
+            if not isinstance(recs, dict):
+                logger.warning("Bulk LLM response was not a JSON object")
+                return results
+
+            for context in batch:
+                rec = recs.get(context.get('service'))
+                if isinstance(rec, str) and rec.strip():
+                    rec = rec.strip()
+                    results[context.get('service')] = rec
+                    _llm_response_cache.add(context, rec)
         except Exception as e:
-            logger.warning(f"API health check failed: {str(e)}")
-            return False
+            logger.warning(f"Bulk LLM recommendation failed: {str(e)}")
+        return results
 
+    def recommend_many(self, contexts: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Generate recommendations for several contexts concurrently.
+        Calls are network-bound, so they are fanned out over a thread pool and
+        total latency tracks the slowest call rather than the sum of all calls.
+        Returns one result per context, in order (None where recommend() failed).
+        """
+        if not contexts or not self.enabled or not self.api_key:
+            return [None] * len(contexts)
 
-def get_recommendation_with_fallback(service: str, anomaly_count: int, 
-                                   metric_name: str = None, metric_value: float = None) -> str:
+        max_workers = min(self.max_concurrency, len(contexts))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(self.recommend, contexts))
+
+
+# Shared clients, built on first use and reused across calls
+_api_client: Optional[RecommendationsAPI] = None
+_llm_client: Optional[LLMProvider] = None
+_client_lock = threading.Lock()
+
+# Shared across clients so every caller sees the same view of API health
+_api_breaker = _CircuitBreaker(
+    fail_threshold=int(API_CONFIG.get('circuit_fail_threshold', 5)),
+    open_seconds=float(API_CONFIG.get('circuit_open_seconds', 30))
+)
+
+# Last good API recommendation per service, served while the circuit is open
+_last_api_recommendation = _TTLCache(
+    maxsize=int(LLM_CONFIG.get('cache_maxsize', 1024)),
+    ttl=float(API_CONFIG.get('circuit_stale_ttl', 300)),
+    negative_ttl=0
+)
+
+# Near-duplicate LLM contexts (same service and metric, close values) share responses
+_llm_response_cache = _SimilarContextCache(
+    ttl=float(LLM_CONFIG.get('cache_ttl', 30)),
+    tolerance=float(LLM_CONFIG.get('similarity_tolerance', 0.05)),
+    maxsize=int(LLM_CONFIG.get('cache_maxsize', 1024))
+)
+
+
+def _get_api_client() -> RecommendationsAPI:
     """
-    Get recommendation for a service, trying API first and falling back to local config.
+    Return the shared RecommendationsAPI client, creating it on first use.
     
-    Args:
-        service: Service name
-        anomaly_count: Number of anomalies
-        metric_name: Metric name (optional)
-        metric_value: Metric value (optional)
-        
     Returns:
-        str: Recommendation text
+        RecommendationsAPI: Module-wide client whose session is reused across calls
     """
-    logger.info(f"Getting recommendation for service '{service}'")
+    global _api_client
+    if _api_client is None:
+        with _client_lock:
+            if _api_client is None:
+                _api_client = RecommendationsAPI()
+    return _api_client
+
+
+def _get_llm_client() -> LLMProvider:
+    """
+    Return the shared LLMProvider, creating it on first use.
+    
+    Returns:
+        LLMProvider: Module-wide LLM client whose session is reused across calls
+    """
+    global _llm_client
+    if _llm_client is None:
+        with _client_lock:
+            if _llm_client is None:
+                _llm_client = LLMProvider()
+    return _llm_client
+
+
+# Remote (API/LLM) recommendations are effectively idempotent over short
+# horizons, so identical anomaly contexts reuse the previous answer
+_recommendation_cache = _TTLCache(
+    maxsize=int(LLM_CONFIG.get('cache_maxsize', 1024)),
+    ttl=float(LLM_CONFIG.get('cache_ttl', 30)),
+    negative_ttl=float(LLM_CONFIG.get('cache_negative_ttl', 5))
+)
+
+# Anomaly-count bucket edges, matching the severity tiers of the recommendations API
+_ANOMALY_COUNT_BUCKETS = (2, 5, 10)
+
+
+def _recommendation_cache_key(service: str, anomaly_count: int,
+                              metric_name: str = None, metric_value: float = None) -> Tuple:
+    """
+    Build the cache key for a recommendation request.
+    
+    Anomaly counts are bucketed by severity tier and metric values rounded to
+    one decimal, so near-identical contexts share a cached recommendation.
+    Values that are not numeric are keyed by their string form instead.
+    """
+    try:
+        count_bucket = bisect_right(_ANOMALY_COUNT_BUCKETS, anomaly_count or 0)
+    except TypeError:
+        count_bucket = str(anomaly_count)
+    try:
+        value_key = round(float(metric_value), 1) if metric_value is not None else None
+    except (TypeError, ValueError):
+        value_key = str(metric_value)
+    return (service, count_bucket, metric_name, value_key)
+
+
+def _fetch_remote_recommendation(service: str, anomaly_count: int,
+                                 metric_name: str = None, metric_value: float = None) -> Optional[str]:
+    """
+    Fetch a recommendation from the API, then the LLM.
     
+    Returns:
+        str: Recommendation text, or None if neither source produced one
+    """
     # Try API first (unless LLM-only mode)
-    if not LLM_CONFIG.get('llm_only'):
+    if not _LLM_ONLY:
+        # While the API circuit is open, serve its last good answer for this service
+        if _api_breaker.is_open():
+            hit, stale = _last_api_recommendation.get(service)
+            if hit:
+                logger.info(f"API circuit open - using last API recommendation for {service}")
+                return stale
+        
         try:
-            api_client = RecommendationsAPI()
+            api_client = _get_api_client()
             api_recommendation = api_client.get_recommendations(
                 service=service,
                 anomaly_count=anomaly_count,
@@ -347,6 +794,7 @@ def get_recommendation_with_fallback(service: str, anomaly_count: int,
             
             if api_recommendation:
                 logger.info(f"Using API recommendation for {service}")
+                _last_api_recommendation.set(service, api_recommendation)
                 return api_recommendation
                 
         except Exception as e:
@@ -354,7 +802,7 @@ def get_recommendation_with_fallback(service: str, anomaly_count: int,
     
     # Try LLM next (WOW factor)
     try:
-        llm = LLMProvider()
+        llm = _get_llm_client()
         llm_rec = llm.recommend({
             'service': service,
             'anomaly_count': anomaly_count,
@@ -366,10 +814,42 @@ def get_recommendation_with_fallback(service: str, anomaly_count: int,
             return llm_rec
     except Exception as e:
         logger.warning(f"LLM recommendation path failed for {service}: {str(e)}")
+    
+    return None
+
+
+def get_recommendation_with_fallback(service: str, anomaly_count: int, 
+                                   metric_name: str = None, metric_value: float = None) -> str:
+    """
+    Get recommendation for a service, trying API first and falling back to local config.
+    
+    Results from the API/LLM (including the absence of one) are cached for a
+    short TTL keyed by service, anomaly-count bucket, metric name and value.
+    
+    Args:
+        service: Service name
+        anomaly_count: Number of anomalies
+        metric_name: Metric name (optional)
+        metric_value: Metric value (optional)
+        
+    Returns:
+        str: Recommendation text
+    """
+    logger.info(f"Getting recommendation for service '{service}'")
+    
+    cache_key = _recommendation_cache_key(service, anomaly_count, metric_name, metric_value)
+    hit, recommendation = _recommendation_cache.get(cache_key)
+    if hit:
+        logger.info(f"Using cached recommendation result for {service}")
+    else:
+        recommendation = _fetch_remote_recommendation(service, anomaly_count, metric_name, metric_value)
+        _recommendation_cache.set(cache_key, recommendation)
+    
+    if recommendation:
+        return recommendation
 
     # Fallback to local recommendations
     logger.info(f"Using fallback recommendation for {service}")
-    from config import get_recommendation
     return get_recommendation(service)
 
 
@@ -377,6 +857,10 @@ def get_bulk_recommendations_with_fallback(services_data: List[Dict[str, Any]])
     """
     Get recommendations for multiple services, trying API first and falling back to local config.
     
+    While the API circuit is open, services with a last good API answer are
+    served from it, as in the single-service path; only the rest go on to the
+    API, LLM and local fallbacks.
+    
     Args:
         services_data: List of service data dictionaries
         
@@ -385,35 +869,85 @@ def get_bulk_recommendations_with_fallback(services_data: List[Dict[str, Any]])
     """
     logger.info(f"Getting bulk recommendations for {len(services_data)} services")
     
+    stale: Dict[str, str] = {}
+    if not _LLM_ONLY and _api_breaker.is_open():
+        for item in services_data:
+            service = item.get('service')
+            hit, rec = _last_api_recommendation.get(service)
+            if service and hit:
+                stale[service] = rec
+        if stale:
+            logger.info(f"API circuit open - using last API recommendations for {len(stale)} services")
+            services_data = [item for item in services_data if item.get('service') not in stale]
+            if not services_data:
+                return stale
+    
+    return {**stale, **_get_bulk_recommendations(services_data)}
+
+
+def _get_bulk_recommendations(services_data: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Fetch recommendations for several services from the API, then the LLM,
+    then local config.
+    
+    Returns:
+        Dict mapping service names to recommendations
+    """
     # Try API first (unless LLM-only mode)
-    if not LLM_CONFIG.get('llm_only'):
+    if not _LLM_ONLY:
         try:
-            api_client = RecommendationsAPI()
+            api_client = _get_api_client()
             api_recommendations = api_client.get_bulk_recommendations(services_data)
             
             if api_recommendations:
                 logger.info(f"Using API bulk recommendations for {len(api_recommendations)} services")
+                for service, rec in api_recommendations.items():
+                    _last_api_recommendation.set(service, rec)
                 return api_recommendations
                 
         except Exception as e:
             logger.warning(f"API bulk recommendations failed: {str(e)}")
     
-    # Try LLM per-service (best effort)
+    # Try LLM (best effort); cached results are reused and only cache misses
+    # go out to the LLM
     results: Dict[str, str] = {}
     try:
-        llm = LLMProvider()
+        llm = _get_llm_client()
+        misses = []
         for item in services_data:
             service = item.get('service')
             if not service:
                 continue
-            rec = llm.recommend({
-                'service': service,
+            cache_key = _recommendation_cache_key(
+                service, item.get('anomaly_count'), item.get('metric_name'), item.get('metric_value')
+            )
+            hit, rec = _recommendation_cache.get(cache_key)
+            if not hit:
+                misses.append((item, cache_key))
+            elif rec:
+                results[service] = rec
+        
+        contexts = [
+            {
+                'service': item.get('service'),
                 'anomaly_count': item.get('anomaly_count'),
                 'metric_name': item.get('metric_name'),
                 'metric_value': item.get('metric_value'),
-            })
+            }
+            for item, _ in misses
+        ]
+        # One batched call for all misses; services it did not answer are
+        # retried per item
+        bulk_recs = llm.recommend_bulk(contexts)
+        recs = [bulk_recs.get(context['service']) for context in contexts]
+        retry = [i for i, rec in enumerate(recs) if not rec]
+        if retry:
+            for i, rec in zip(retry, llm.recommend_many([contexts[i] for i in retry])):
+                recs[i] = rec
+        for (item, cache_key), rec in zip(misses, recs):
+            _recommendation_cache.set(cache_key, rec)
             if rec:
-                results[service] = rec
+                results[item['service']] = rec
         if results:
             logger.info(f"Using LLM recommendations for {len(results)} services")
             return results
@@ -422,7 +956,6 @@ def get_bulk_recommendations_with_fallback(services_data: List[Dict[str, Any]])
 
     # Fallback to local recommendations
     logger.info("Using fallback recommendations")
-    from config import get_recommendation
     
     fallback_recommendations = {}
     for service_data in services_data:
@@ -9,13 +9,22 @@ Author: War_RoomAI Team
 Version: 1.0.0
 """
 
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, Mapping
+from types import MappingProxyType
 import os
 import logging
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
+# Environment values treated as "true" for boolean settings
+_TRUE_VALUES = frozenset(('1', 'true', 'yes'))
+
+
+def _as_bool(value: Any) -> bool:
+    """Interpret an environment setting such as '1', 'true' or 'yes' as a boolean."""
+    return str(value).lower() in _TRUE_VALUES
+
 # Threshold values for anomaly detection
 # CPU percentage threshold - alerts when CPU usage exceeds this value
 thresholds = {
@@ -27,20 +36,38 @@ thresholds = {
     }
 }
 
+# Thresholds flattened once to {(metric_name, service): value}; scalar
+# thresholds that apply to every service are stored under service None
+_THRESHOLDS_FLAT: Dict[tuple, Union[int, float]] = {
+    (metric, service): value
+    for metric, threshold in thresholds.items()
+    for service, value in (threshold.items() if isinstance(threshold, dict) else [(None, threshold)])
+}
+
 # Correlation window in seconds - how close in time metric anomalies and log errors must be
 correlation_window = 5
 
 # Base date for log timestamp reconstruction
 BASE_DATE = "2025-10-12"
 
+# Cache parsed metrics/logs as Parquet next to the data (needs pyarrow);
+# set WARROOM_DATA_CACHE=0 to always re-parse the CSV sources
+DATA_CACHE_ENABLED = _as_bool(os.environ.get('WARROOM_DATA_CACHE', 'true'))
+
 # API configuration for recommendations
 API_CONFIG = {
     'base_url': 'http://localhost:5000',  # Mock server for testing
     'recommendations_endpoint': '/api/v1/recommendations',
     'timeout': 3,  # seconds (reduced for faster demo)
     'retry_attempts': 0,  # fast-fail to LLM for demo
-    'retry_delay': 1,  # seconds
-    'fallback_enabled': True  # Use local recommendations if API fails
+    'retry_delay': 1,  # seconds (base of the exponential backoff)
+    'retry_cap': 10,  # seconds (maximum backoff between attempts)
+    'fallback_enabled': True,  # Use local recommendations if API fails
+    'pool_connections': 10,  # connection pools kept by the HTTP session
+    'pool_maxsize': 32,  # keep-alive connections per pool
+    'circuit_fail_threshold': 5,  # consecutive failed calls before the circuit opens
+    'circuit_open_seconds': 30,  # fail fast for this long before probing the API again
+    'circuit_stale_ttl': 300  # seconds a last good recommendation may be served while open
 }
 
 # API headers and authentication (if needed)
@@ -55,23 +82,34 @@ API_HEADERS = {
 #     'auth_type': 'bearer'  # or 'api_key'
 # }
 
-# Service-specific recommendations for root cause analysis (fallback)
-recommendations = {
+# Service-specific recommendations for root cause analysis (fallback),
+# exposed as a read-only view
+recommendations = MappingProxyType({
     'api': "Check API latency and backend dependencies. Possible timeout or overload.",
     'database': "Database CPU or query latency spikes — consider indexing or connection pooling.",
     'frontend': "Frontend response time high — check for slow API calls or JavaScript rendering bottlenecks."
-}
+})
+
+# Returned by get_recommendation for services without a predefined entry
+_DEFAULT_RECOMMENDATION = "No predefined recommendation available for this service."
+_recommendation_get = recommendations.get
 
 # LLM (OpenAI) configuration for dynamic recommendations (WOW factor)
 LLM_CONFIG: Dict[str, Any] = {
-    'enabled': os.environ.get('LLM_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'enabled': _as_bool(os.environ.get('LLM_ENABLED', 'true')),
     'provider': os.environ.get('LLM_PROVIDER', 'openai'),
     'api_key': os.environ.get('OPENAI_API_KEY', ''),
     'api_base': os.environ.get('OPENAI_API_BASE', 'https://api.openai.com'),
     'model': os.environ.get('OPENAI_MODEL', 'gpt-4o-mini'),
     'timeout': float(os.environ.get('LLM_TIMEOUT', '12')),  # seconds
     'max_tokens': int(os.environ.get('LLM_MAX_TOKENS', '300')),
-    'llm_only': os.environ.get('LLM_ONLY', 'false').lower() in ('1', 'true', 'yes'),
+    'max_bulk_tokens': int(os.environ.get('LLM_MAX_BULK_TOKENS', '4096')),  # completion budget cap for one bulk call
+    'llm_only': _as_bool(os.environ.get('LLM_ONLY', 'false')),
+    'max_concurrency': int(os.environ.get('LLM_MAX_CONCURRENCY', '8')),  # parallel calls for bulk requests
+    'cache_ttl': float(os.environ.get('LLM_CACHE_TTL', '30')),  # seconds; 0 disables recommendation caching
+    'cache_negative_ttl': float(os.environ.get('LLM_CACHE_NEGATIVE_TTL', '5')),  # seconds to remember failed lookups
+    'cache_maxsize': int(os.environ.get('LLM_CACHE_MAXSIZE', '1024')),
+    'similarity_tolerance': float(os.environ.get('LLM_SIMILARITY_TOLERANCE', '0.05')),  # relative metric distance for reusing an LLM answer
 }
 
 
@@ -112,8 +150,8 @@ def validate_config() -> bool:
             raise ValueError(f"Invalid base date format: {BASE_DATE}. Expected YYYY-MM-DD format.")
         
         # Validate recommendations
-        if not isinstance(recommendations, dict):
-            raise ValueError("Recommendations must be a dictionary")
+        if not isinstance(recommendations, Mapping):
+            raise ValueError("Recommendations must be a mapping")
         
         for service, recommendation in recommendations.items():
             if not isinstance(recommendation, str) or not recommendation.strip():
@@ -159,18 +197,17 @@ def get_threshold(metric_name: str, service: str = None) -> Union[int, float, No
     Raises:
         ValueError: If metric_name is invalid or service is required but not provided
     """
+    threshold = _THRESHOLDS_FLAT.get((metric_name, service))
+    if threshold is None:
+        threshold = _THRESHOLDS_FLAT.get((metric_name, None))
+    if threshold is not None:
+        return threshold
+    
     if metric_name not in thresholds:
         logger.warning(f"Unknown metric: {metric_name}")
-        return None
-    
-    threshold = thresholds[metric_name]
-    
-    if isinstance(threshold, dict):
-        if service is None:
-            raise ValueError(f"Service name required for metric '{metric_name}'")
-        return threshold.get(service)
-    else:
-        return threshold
+    elif service is None:
+        raise ValueError(f"Service name required for metric '{metric_name}'")
+    return None
 
 
 def get_recommendation(service: str) -> str:
@@ -183,12 +220,13 @@ def get_recommendation(service: str) -> str:
     Returns:
         Recommendation string or default message if service not found
     """
-    return recommendations.get(service, "No predefined recommendation available for this service.")
+    return _recommendation_get(service, _DEFAULT_RECOMMENDATION)
 
 
-# Validate configuration on module import
-try:
-    validate_config()
-except Exception as e:
-    logger.error(f"Configuration validation failed on import: {str(e)}")
-    raise
\ No newline at end of file
+# Validate configuration on module import (set WARROOM_VALIDATE_CONFIG=0 to skip)
+if _as_bool(os.environ.get('WARROOM_VALIDATE_CONFIG', 'true')):
+    try:
+        validate_config()
+    except Exception as e:
+        logger.error(f"Configuration validation failed on import: {str(e)}")
+        raise
\ No newline at end of file
@@ -9,14 +9,113 @@ Author: War_RoomAI Team
 Version: 1.0.0
 """
 
+import numpy as np
 import pandas as pd
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from config import correlation_window
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
+# Columns correlate() needs from each input. Tuples, not sets: the order
+# feeds the cache digest and the validation error message
+_METRIC_REQUIRED_COLUMNS = ('time_stamp', 'service', 'metric_name', 'value')
+_LOG_REQUIRED_COLUMNS = ('timestamp', 'service', 'message')
+
+# Columns of a correlate() result; also used to build empty results
+CORRELATION_COLUMNS = ('timestamp', 'metric_service', 'metric_name', 'metric_value', 'log_service', 'log_message')
+
+# Recent correlate() results keyed by a content hash of both inputs and the
+# correlation window, so re-running on unchanged anomalies is a lookup
+_CORRELATION_CACHE_SIZE = 16
+_correlation_cache: 'OrderedDict[tuple, pd.DataFrame]' = OrderedDict()
+
+
+def _frame_digest(df: pd.DataFrame, columns: List[str]) -> bytes:
+    """
+    Hash the contents of the given columns (row order included, index ignored).
+    
+    Args:
+        df: DataFrame to hash
+        columns: Columns that the result depends on
+        
+    Returns:
+        bytes: 16-byte digest of the column values
+    """
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+
+
+def _take_categorical(values: pd.Series, idx: np.ndarray) -> pd.Categorical:
+    """
+    Take values at the given positions as a Categorical.
+    
+    Categories are ordered by first appearance in the result (as unique()
+    orders plain string columns), and only values that occur are kept as
+    categories. Count ties in value_counts follow this category order, so
+    rankings must break ties explicitly rather than rely on it.
+    
+    Args:
+        values: Source column
+        idx: Positions to take
+        
+    Returns:
+        pd.Categorical: The taken values, encoded as small integer codes
+    """
+    codes, uniques = pd.factorize(values)
+    taken = codes[idx]
+    # Re-code by first appearance among the taken rows; -1 marks missing values
+    new_codes, first_seen = pd.factorize(taken)
+    present = first_seen >= 0
+    remap = np.where(present, np.cumsum(present) - 1, -1)
+    return pd.Categorical.from_codes(remap[new_codes], categories=uniques.take(first_seen[present]))
+
+
+def _correlate_kernel(metric_ts: np.ndarray, log_ts: np.ndarray,
+                      window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every (metric, log) pair whose timestamps are at most window apart.
+    
+    Pure array code on int64 nanosecond timestamps (no NaT, no Python objects):
+    logs are sorted once, and the logs within the window of each metric form
+    one contiguous slice found by binary search. Every log inside the window
+    is kept (not only the nearest one), matching the pairwise
+    |metric - log| <= window comparison.
+    
+    Args:
+        metric_ts: Metric anomaly timestamps as int64 nanoseconds
+        log_ts: Log error timestamps as int64 nanoseconds
+        window: Correlation window in nanoseconds
+        
+    Returns:
+        Tuple of (metric_idx, log_idx, time_diff_seconds): positions into the
+        inputs for each match, ordered by metric position and then by log
+        position, and the absolute time difference of each pair in seconds
+    """
+    log_order = np.argsort(log_ts, kind='stable')
+    sorted_log_ts = log_ts[log_order]
+    lo = np.searchsorted(sorted_log_ts, metric_ts - window, side='left')
+    hi = np.searchsorted(sorted_log_ts, metric_ts + window, side='right')
+    
+    # Expand the slices into (metric, log) index pairs without a Python
+    # loop: each metric anomaly repeats once per match, and its log
+    # positions run from lo to hi - 1 in the sorted order
+    counts = hi - lo
+    total = int(counts.sum())
+    metric_idx = np.repeat(np.arange(len(metric_ts)), counts)
+    group_start = np.cumsum(counts) - counts
+    log_idx = log_order[np.arange(total) + np.repeat(lo - group_start, counts)]
+    
+    # Restore the logs' input order within each metric anomaly's matches
+    pair_order = np.lexsort((log_idx, metric_idx))
+    metric_idx = metric_idx[pair_order]
+    log_idx = log_idx[pair_order]
+    
+    return metric_idx, log_idx, np.abs(metric_ts[metric_idx] - log_ts[log_idx]) / 1e9
+
 
 def correlate(metric_anomalies: pd.DataFrame, log_anomalies: pd.DataFrame) -> pd.DataFrame:
     """
@@ -67,23 +166,21 @@ def correlate(metric_anomalies: pd.DataFrame, log_anomalies: pd.DataFrame) -> pd
     # Handle empty DataFrames
     if metric_anomalies.empty:
         logger.warning("No metric anomalies provided - no correlations possible")
-        return pd.DataFrame(columns=['timestamp', 'metric_service', 'metric_name', 'metric_value', 'log_service', 'log_message'])
+        return pd.DataFrame(columns=CORRELATION_COLUMNS)
     
     if log_anomalies.empty:
         logger.warning("No log anomalies provided - no correlations possible")
-        return pd.DataFrame(columns=['timestamp', 'metric_service', 'metric_name', 'metric_value', 'log_service', 'log_message'])
+        return pd.DataFrame(columns=CORRELATION_COLUMNS)
     
     # Validate required columns for metric anomalies
-    metric_required_columns = ['time_stamp', 'service', 'metric_name', 'value']
-    metric_missing_columns = [col for col in metric_required_columns if col not in metric_anomalies.columns]
+    metric_missing_columns = [col for col in _METRIC_REQUIRED_COLUMNS if col not in metric_anomalies.columns]
     if metric_missing_columns:
         error_msg = f"metric_anomalies missing required columns: {metric_missing_columns}"
         logger.error(error_msg)
         raise ValueError(error_msg)
     
     # Validate required columns for log anomalies
-    log_required_columns = ['timestamp', 'service', 'message']
-    log_missing_columns = [col for col in log_required_columns if col not in log_anomalies.columns]
+    log_missing_columns = [col for col in _LOG_REQUIRED_COLUMNS if col not in log_anomalies.columns]
     if log_missing_columns:
         error_msg = f"log_anomalies missing required columns: {log_missing_columns}"
         logger.error(error_msg)
@@ -92,74 +189,70 @@ def correlate(metric_anomalies: pd.DataFrame, log_anomalies: pd.DataFrame) -> pd
     logger.info(f"Correlating {len(metric_anomalies)} metric anomalies with {len(log_anomalies)} log errors")
     logger.info(f"Using correlation window of {correlation_window} seconds")
     
-    correlated = []
-    processed_pairs = 0
-    error_count = 0
-    
     try:
-        for m_index, m_row in metric_anomalies.iterrows():
-            try:
-                # Extract metric anomaly data
-                metric_timestamp = m_row['time_stamp']
-                metric_service = m_row['service']
-                metric_name = m_row['metric_name']
-                metric_value = m_row['value']
-                
-                # Skip if timestamp is null/NaN
-                if pd.isna(metric_timestamp):
-                    logger.debug(f"Skipping metric anomaly at row {m_index}: invalid timestamp")
-                    continue
-                
-                for l_index, l_row in log_anomalies.iterrows():
-                    try:
-                        # Extract log error data
-                        log_timestamp = l_row['timestamp']
-                        log_service = l_row['service']
-                        log_message = l_row['message']
-                        
-                        # Skip if timestamp is null/NaN
-                        if pd.isna(log_timestamp):
-                            logger.debug(f"Skipping log error at row {l_index}: invalid timestamp")
-                            continue
-                        
-                        # Calculate time difference in seconds
-                        time_diff = abs((metric_timestamp - log_timestamp).total_seconds())
-                        
-                        # Check if events occur within correlation window
-                        if time_diff <= correlation_window:
-                            correlation_record = {
-                                'timestamp': metric_timestamp,  # Use metric timestamp as reference
-                                'metric_service': metric_service,
-                                'metric_name': metric_name,
-                                'metric_value': metric_value,
-                                'log_service': log_service,
-                                'log_message': log_message,
-                                'time_diff_seconds': time_diff
-                            }
-                            correlated.append(correlation_record)
-                            
-                            logger.debug(f"Correlation found: {metric_service}.{metric_name} ({metric_value}) "
-                                        f"and {log_service} log error within {time_diff:.2f}s")
-                        
-                        processed_pairs += 1
-                        
-                    except Exception as e:
-                        error_count += 1
-                        logger.warning(f"Error processing log anomaly at row {l_index}: {str(e)}")
-                        continue
-                        
-            except Exception as e:
-                error_count += 1
-                logger.warning(f"Error processing metric anomaly at row {m_index}: {str(e)}")
-                continue
-        
-        # Convert correlations to DataFrame
-        correlated_df = pd.DataFrame(correlated) if correlated else pd.DataFrame(columns=['timestamp', 'metric_service', 'metric_name', 'metric_value', 'log_service', 'log_message'])
-        
-        logger.info(f"Correlation analysis completed: {len(correlated_df)} correlations found from {processed_pairs} event pairs")
-        
-        if error_count > 0:
-            logger.warning(f"Encountered {error_count} errors during correlation processing")
+        cache_key = (
+            _frame_digest(metric_anomalies, list(_METRIC_REQUIRED_COLUMNS)),
+            _frame_digest(log_anomalies, list(_LOG_REQUIRED_COLUMNS)),
+            correlation_window
+        )
+        cached = _correlation_cache.get(cache_key)
+        if cached is not None:
+            _correlation_cache.move_to_end(cache_key)
+            logger.info(f"Reusing cached correlation result: {len(cached)} correlations")
+            return cached.copy()
+        
+        # Skip anomalies without a timestamp
+        metrics = metric_anomalies[metric_anomalies['time_stamp'].notna()]
+        logs = log_anomalies[log_anomalies['timestamp'].notna()]
+        skipped = (len(metric_anomalies) - len(metrics)) + (len(log_anomalies) - len(logs))
+        # Debug messages are gated so their f-strings are not built when
+        # debug logging is off
+        if skipped and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Skipping {skipped} anomalies with invalid timestamps")
+        
+        # Work on int64 nanoseconds: window tests and differences are plain
+        # integer ops, converted to seconds only for the output column
+        metric_ts = metrics['time_stamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+        log_ts = logs['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+        window = np.int64(pd.Timedelta(seconds=correlation_window).value)
+        
+        # Min/max pruning: rows outside the other side's time range (widened
+        # by the window) cannot match, so drop them before the join
+        if len(metric_ts) and len(log_ts):
+            log_keep = (log_ts >= metric_ts.min() - window) & (log_ts <= metric_ts.max() + window)
+            metric_keep = (metric_ts >= log_ts.min() - window) & (metric_ts <= log_ts.max() + window)
+            if not log_keep.all():
+                logs, log_ts = logs[log_keep], log_ts[log_keep]
+            if not metric_keep.all():
+                metrics, metric_ts = metrics[metric_keep], metric_ts[metric_keep]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Time-range pruning left {len(metrics)} metric anomalies and {len(logs)} log errors")
+        
+        metric_idx, log_idx, time_diff_seconds = _correlate_kernel(metric_ts, log_ts, window)
+        
+        if len(metric_idx) == 0:
+            correlated_df = pd.DataFrame(columns=CORRELATION_COLUMNS)
+        else:
+            # Gather output columns with typed take() on each column's array:
+            # no per-match records, and string/datetime columns keep their
+            # dtype instead of round-tripping through object arrays. Service
+            # columns are categorical so service filters compare integer codes
+            correlated_df = pd.DataFrame({
+                'timestamp': metrics['time_stamp'].array.take(metric_idx),  # Use metric timestamp as reference
+                'metric_service': _take_categorical(metrics['service'], metric_idx),
+                'metric_name': metrics['metric_name'].array.take(metric_idx),
+                'metric_value': metrics['value'].array.take(metric_idx),
+                'log_service': _take_categorical(logs['service'], log_idx),
+                'log_message': logs['message'].array.take(log_idx),
+                'time_diff_seconds': time_diff_seconds
+            })
+        
+        logger.info(f"Correlation analysis completed: {len(correlated_df)} correlations found "
+                    f"between {len(metrics)} metric anomalies and {len(logs)} log errors")
+        
+        _correlation_cache[cache_key] = correlated_df.copy()
+        while len(_correlation_cache) > _CORRELATION_CACHE_SIZE:
+            _correlation_cache.popitem(last=False)
         
         return correlated_df
         
@@ -222,12 +315,20 @@ def filter_correlations_by_service(correlated_df: pd.DataFrame, service_name: st
         return correlated_df
     
     try:
-        # Filter for correlations where either metric_service or log_service matches
+        # Filter for correlations where either metric_service or log_service
+        # matches; on categorical columns == looks the name up once and
+        # compares integer codes
         filtered = correlated_df[
             (correlated_df['metric_service'] == service_name) | 
             (correlated_df['log_service'] == service_name)
         ]
         
+        # Drop categories left without rows so counts on the result only
+        # cover services that are present
+        for column in ('metric_service', 'log_service'):
+            if isinstance(filtered[column].dtype, pd.CategoricalDtype):
+                filtered = filtered.assign(**{column: filtered[column].cat.remove_unused_categories()})
+        
         logger.info(f"Filtered correlations for service '{service_name}': {len(filtered)} matches")
         return filtered
         
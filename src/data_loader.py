@@ -8,16 +8,145 @@ Author: War_RoomAI Team
 Version: 1.0.0
 """
 
+import numpy as np
 import pandas as pd
 import glob
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Optional
 import logging
-from config import BASE_DATE
+from config import BASE_DATE, DATA_CACHE_ENABLED
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
+# Standard log levels, kept as the leading categories of the 'level' column
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARN', 'WARNING', 'ERROR', 'CRITICAL']
+
+# Use pyarrow's multithreaded CSV reader when it is installed
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    _CSV_ENGINE = 'pyarrow'
+except ImportError:
+    pa = None
+    _CSV_ENGINE = 'c'
+
+# Block size for the streaming pyarrow log reader. Each block is parsed and
+# trimmed on its own, so only the compact per-file result stays resident
+_LOG_BLOCK_SIZE = 1 << 20
+
+# Parsed frames are cached as Parquet under <data dir>/.cache (pyarrow only)
+_CACHE_DIR_NAME = '.cache'
+_CACHE_ENABLED = DATA_CACHE_ENABLED and _CSV_ENGINE == 'pyarrow'
+# Bump whenever the parsers change the frames they produce (columns, dtypes,
+# values) so caches written by an older loader are re-parsed, not reused
+_CACHE_VERSION = 3
+
+
+def _cache_signature(sources: List[str]) -> dict:
+    """Describe the inputs a cached frame was parsed from (loader version, paths, mtimes, sizes, base date)."""
+    stats = [(os.path.abspath(path), os.stat(path)) for path in sorted(sources)]
+    return {
+        'version': _CACHE_VERSION,
+        'sources': [[path, st.st_mtime_ns, st.st_size] for path, st in stats],
+        'base_date': BASE_DATE
+    }
+
+
+def _cache_path(data_dir: str, name: str) -> str:
+    """Return the Parquet cache file for a named frame under data_dir."""
+    return os.path.join(data_dir, _CACHE_DIR_NAME, f"{name}.parquet")
+
+
+def _read_cached_frame(data_dir: str, name: str, sources: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Load a previously parsed frame if its sources are unchanged.
+    
+    Returns:
+        pd.DataFrame: The cached frame, or None on a miss or unreadable cache
+    """
+    if not _CACHE_ENABLED:
+        return None
+    path = _cache_path(data_dir, name)
+    try:
+        with open(path + '.meta.json') as f:
+            if json.load(f) != _cache_signature(sources):
+                return None
+        df = pd.read_parquet(path, engine='pyarrow')
+        logger.info(f"Loaded cached {name} data from {path}")
+        return df
+    except (OSError, ValueError) as e:
+        logger.debug(f"No usable {name} cache at {path}: {str(e)}")
+        return None
+
+
+def _write_cached_frame(data_dir: str, name: str, sources: List[str], df: pd.DataFrame) -> None:
+    """Store a parsed frame with its source signature; failures only log a warning."""
+    if not _CACHE_ENABLED:
+        return
+    path = _cache_path(data_dir, name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, engine='pyarrow', compression='zstd')
+        # Written last, so a partial Parquet file is never paired with valid metadata
+        with open(path + '.meta.json', 'w') as f:
+            json.dump(_cache_signature(sources), f)
+    except Exception as e:
+        logger.warning(f"Failed to write {name} cache to {path}: {str(e)}")
+
+
+def _read_csv(filepath: str, **kwargs) -> pd.DataFrame:
+    """
+    Read a CSV with pandas, preferring the pyarrow engine when it is installed.
+    
+    pyarrow rejects ragged rows outright, while the C engine fills short rows
+    with NaN (and still raises on long ones). Files with any ragged row are
+    re-read with the C engine so malformed input parses exactly as before.
+    
+    Args:
+        filepath: Path to the CSV file
+        **kwargs: Options passed through to pd.read_csv
+        
+    Returns:
+        pd.DataFrame: The parsed file
+    """
+    if _CSV_ENGINE == 'pyarrow':
+        try:
+            return pd.read_csv(filepath, engine='pyarrow', **kwargs)
+        except pd.errors.ParserError as e:
+            logger.warning(f"Re-reading {filepath} with the C engine: {str(e)}")
+    return pd.read_csv(filepath, engine='c', **kwargs)
+
+
+def _parse_metric_timestamps(timestamps: pd.Series) -> pd.Series:
+    """
+    Parse 'DD-MM-YYYY HH:MM' metric timestamps.
+    
+    The day-first format is not ISO, so pandas parses it on its slow strptime
+    path. Fixed-width values are instead reordered to 'YYYY-MM-DD HH:MM' by
+    slicing at known offsets and parsed on the ISO fast path; any value that
+    does not parse that way (e.g. a single-digit day) falls back to the
+    original format.
+    
+    Args:
+        timestamps: Raw timestamp strings
+        
+    Returns:
+        pd.Series: Parsed timestamps, NaT where parsing failed
+    """
+    iso = (timestamps.str.slice(6, 10) + timestamps.str.slice(5, 6) + timestamps.str.slice(3, 5)
+           + timestamps.str.slice(2, 3) + timestamps.str.slice(0, 2) + timestamps.str.slice(10))
+    parsed = pd.to_datetime(iso, format='%Y-%m-%d %H:%M', errors='coerce')
+    
+    retry = parsed.isna() & timestamps.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(timestamps[retry], format='%d-%m-%Y %H:%M', errors='coerce')
+    return parsed
+
 
 def load_metrics(filepath: str) -> pd.DataFrame:
     """
@@ -50,9 +179,14 @@ def load_metrics(filepath: str) -> pd.DataFrame:
         logger.error(error_msg)
         raise pd.errors.EmptyDataError(error_msg)
     
+    data_dir = os.path.dirname(filepath)
+    cached = _read_cached_frame(data_dir, os.path.basename(filepath), [filepath])
+    if cached is not None:
+        return cached
+    
     try:
         # Load CSV with tab separator and no header
-        df = pd.read_csv(
+        df = _read_csv(
             filepath, 
             sep='\t', 
             header=None, 
@@ -72,7 +206,7 @@ def load_metrics(filepath: str) -> pd.DataFrame:
         
         # Parse timestamps
         try:
-            df['time_stamp'] = pd.to_datetime(df['time_stamp'], format='%d-%m-%Y %H:%M', errors='coerce')
+            df['time_stamp'] = _parse_metric_timestamps(df['time_stamp'])
             
             # Check for parsing failures
             invalid_timestamps = df['time_stamp'].isna().sum()
@@ -98,10 +232,14 @@ def load_metrics(filepath: str) -> pd.DataFrame:
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        # Sort by timestamp
-        df = df.sort_values(by='time_stamp')
+        # Sort by timestamp. Exported metrics are usually already in time
+        # order, so check first and skip the sort; otherwise sort stably so
+        # rows with equal timestamps keep their file order
+        if not df['time_stamp'].is_monotonic_increasing:
+            df = df.sort_values(by='time_stamp', kind='stable')
         
         logger.info(f"Processed metrics data: {len(df)} valid records")
+        _write_cached_frame(data_dir, os.path.basename(filepath), [filepath], df)
         return df
         
     except pd.errors.EmptyDataError:
@@ -114,6 +252,183 @@ def load_metrics(filepath: str) -> pd.DataFrame:
         raise ValueError(error_msg)
 
 
+def _normalize_levels(levels: pd.Series) -> pd.Categorical:
+    """
+    Convert raw log levels (e.g. ' WARN  ') to a stripped, upper-case categorical.
+    
+    Only the distinct raw values are normalized; rows are re-coded by integer
+    code. Categories are LOG_LEVELS followed by any other levels present.
+    
+    Args:
+        levels: Raw log level strings
+        
+    Returns:
+        pd.Categorical: Normalized levels, NaN where the level is missing
+    """
+    raw = levels.astype('category')
+    normalized = raw.cat.categories.str.strip().str.upper()
+    extra = [level for level in normalized.unique() if level not in LOG_LEVELS]
+    categories = pd.Index(LOG_LEVELS + extra)
+    
+    codes = raw.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, categories.get_indexer(normalized)[codes], -1)
+    return pd.Categorical.from_codes(new_codes, categories=categories)
+
+
+def _read_log_file_arrow(file_path: str, base_date_prefix: str) -> Optional[pd.DataFrame]:
+    """
+    Stream a log file through pyarrow's block reader.
+    
+    Timestamps are parsed and messages trimmed one block at a time, so the
+    raw timestamp strings of the whole file are never held at once. A file
+    with ragged rows (too few or too many fields) is handed to the pandas
+    reader instead, which parses them as the C engine always has.
+    
+    Args:
+        file_path: Path to the .log file
+        base_date_prefix: 'YYYY-MM-DD ' prefix used to build full timestamps
+        
+    Returns:
+        pd.DataFrame: 'timestamp', 'level' and 'message' columns with
+        unparseable timestamps removed, or None if the file cannot be parsed
+    """
+    invalid_rows = []
+    
+    def skip_invalid_row(row):
+        invalid_rows.append(row.number)
+        return 'skip'
+    
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(column_names=['timestamp', 'level', 'message'], block_size=_LOG_BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(delimiter='|', invalid_row_handler=skip_invalid_row),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={'timestamp': pa.string(), 'level': pa.string(), 'message': pa.string()},
+            null_values=[''], strings_can_be_null=True
+        )
+    )
+    
+    schema = pa.schema([('timestamp', pa.timestamp('us')), ('level', pa.string()), ('message', pa.string())])
+    batches = []
+    invalid_timestamps = 0
+    for batch in reader:
+        # Reconstruct full timestamps using base date, as in the pandas path
+        full_timestamps = pc.binary_join_element_wise(
+            base_date_prefix, pc.utf8_trim_whitespace(batch.column(0)), ''
+        )
+        timestamps = pc.strptime(full_timestamps, format='%Y-%m-%d %H:%M:%S', unit='us', error_is_null=True)
+        batch = pa.record_batch(
+            [timestamps, batch.column(1), pc.utf8_trim_whitespace(batch.column(2))], schema=schema
+        )
+        
+        # Remove rows with invalid timestamps
+        if timestamps.null_count:
+            invalid_timestamps += timestamps.null_count
+            batch = batch.filter(pc.is_valid(timestamps))
+        batches.append(batch)
+    
+    if invalid_rows:
+        logger.warning(f"Re-reading {file_path} with pandas: {len(invalid_rows)} ragged rows")
+        return _read_log_file_pandas(file_path, base_date_prefix)
+    
+    if invalid_timestamps > 0:
+        logger.warning(f"Removing {invalid_timestamps} invalid timestamps from {file_path}")
+    
+    table = pa.Table.from_batches(batches, schema=schema)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def _read_log_file_pandas(file_path: str, base_date_prefix: str) -> Optional[pd.DataFrame]:
+    """
+    Read a log file with pandas (used when pyarrow is not installed, or for
+    files with ragged rows).
+    
+    Args:
+        file_path: Path to the .log file
+        base_date_prefix: 'YYYY-MM-DD ' prefix used to build full timestamps
+        
+    Returns:
+        pd.DataFrame: 'timestamp', 'level' and 'message' columns with
+        unparseable timestamps removed, or None if the file cannot be parsed
+    """
+    df = _read_csv(
+        file_path, 
+        sep="|", 
+        names=['timestamp', 'level', 'message'],
+        dtype={'timestamp': str, 'level': str, 'message': str}
+    )
+    
+    # Validate required columns
+    required_columns = ['timestamp', 'level', 'message']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        logger.warning(f"Skipping {file_path}: missing columns {missing_columns}")
+        return None
+    
+    # Parse timestamps
+    try:
+        # Reconstruct full timestamps using base date: prefix the date
+        # and parse date and time-of-day in one vectorized call
+        df['timestamp'] = pd.to_datetime(
+            base_date_prefix + df['timestamp'].str.strip(), format='%Y-%m-%d %H:%M:%S', errors='coerce'
+        )
+        
+        # Remove rows with invalid timestamps
+        invalid_timestamps = df['timestamp'].isna().sum()
+        if invalid_timestamps > 0:
+            logger.warning(f"Removing {invalid_timestamps} invalid timestamps from {file_path}")
+            df = df.dropna(subset=['timestamp'])
+        
+    except Exception as e:
+        logger.warning(f"Failed to parse timestamps in {file_path}: {str(e)}")
+        return None
+    
+    # Clean up message column (remove extra whitespace)
+    df['message'] = df['message'].str.strip()
+    
+    return df
+
+
+def _load_log_file(file_path: str, base_date_prefix: str) -> Optional[pd.DataFrame]:
+    """
+    Load and parse a single log file.
+    
+    Args:
+        file_path: Path to the .log file
+        base_date_prefix: 'YYYY-MM-DD ' prefix used to build full timestamps
+        
+    Returns:
+        pd.DataFrame: Parsed log entries tagged with the service name, or None
+        if the file is empty or cannot be parsed
+    """
+    try:
+        logger.debug(f"Processing log file: {file_path}")
+        
+        # Check if file is empty
+        if os.path.getsize(file_path) == 0:
+            logger.warning(f"Skipping empty log file: {file_path}")
+            return None
+        
+        if pa is not None:
+            df = _read_log_file_arrow(file_path, base_date_prefix)
+        else:
+            df = _read_log_file_pandas(file_path, base_date_prefix)
+        if df is None:
+            return None
+        
+        # Add service name based on filename
+        service_name = os.path.basename(file_path).removesuffix('.log')
+        df['service'] = service_name
+        
+        logger.debug(f"Successfully processed {len(df)} log entries from {file_path}")
+        return df
+        
+    except Exception as e:
+        logger.error(f"Failed to process log file {file_path}: {str(e)}")
+        # Continue processing other files even if one fails
+        return None
+
+
 def load_logs(folder_path: str) -> pd.DataFrame:
     """
     Load log data from all .log files in a directory.
@@ -154,67 +469,18 @@ def load_logs(folder_path: str) -> pd.DataFrame:
     
     logger.info(f"Found {len(log_files)} log files: {[os.path.basename(f) for f in log_files]}")
     
-    logs = []
-    base_date = pd.to_datetime(BASE_DATE)
+    cached = _read_cached_frame(folder_path, 'logs', log_files)
+    if cached is not None:
+        return cached
     
-    for file_path in log_files:
-        try:
-            logger.debug(f"Processing log file: {file_path}")
-            
-            # Check if file is empty
-            if os.path.getsize(file_path) == 0:
-                logger.warning(f"Skipping empty log file: {file_path}")
-                continue
-            
-            # Load log file
-            df = pd.read_csv(
-                file_path, 
-                sep="|", 
-                names=['timestamp', 'level', 'message'],
-                dtype={'timestamp': str, 'level': str, 'message': str}
-            )
-            
-            # Validate required columns
-            required_columns = ['timestamp', 'level', 'message']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                logger.warning(f"Skipping {file_path}: missing columns {missing_columns}")
-                continue
-            
-            # Parse timestamps
-            try:
-                df['timestamp'] = pd.to_datetime(df['timestamp'].str.strip(), format='%H:%M:%S', errors='coerce')
-                
-                # Reconstruct full timestamps using base date
-                df['timestamp'] = df['timestamp'].apply(
-                    lambda t: base_date + pd.Timedelta(hours=t.hour, minutes=t.minute, seconds=t.second)
-                    if pd.notnull(t) else pd.NaT
-                )
-                
-                # Remove rows with invalid timestamps
-                invalid_timestamps = df['timestamp'].isna().sum()
-                if invalid_timestamps > 0:
-                    logger.warning(f"Removing {invalid_timestamps} invalid timestamps from {file_path}")
-                    df = df.dropna(subset=['timestamp'])
-                
-            except Exception as e:
-                logger.warning(f"Failed to parse timestamps in {file_path}: {str(e)}")
-                continue
-            
-            # Add service name based on filename
-            service_name = os.path.basename(file_path).replace('.log', '')
-            df['service'] = service_name
-            
-            # Clean up message column (remove extra whitespace)
-            df['message'] = df['message'].str.strip()
-            
-            logs.append(df)
-            logger.debug(f"Successfully processed {len(df)} log entries from {file_path}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process log file {file_path}: {str(e)}")
-            # Continue processing other files even if one fails
-            continue
+    base_date_prefix = pd.to_datetime(BASE_DATE).strftime('%Y-%m-%d ')
+    
+    # Parse files concurrently; the CSV readers and to_datetime release the
+    # GIL, so threads overlap. map() keeps the files in glob order
+    max_workers = min(len(log_files), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        parsed = pool.map(partial(_load_log_file, base_date_prefix=base_date_prefix), log_files)
+        logs = [df for df in parsed if df is not None]
     
     if not logs:
         error_msg = f"No valid log data found in directory: {folder_path}"
@@ -226,9 +492,20 @@ def load_logs(folder_path: str) -> pd.DataFrame:
         combined_logs = pd.concat(logs, ignore_index=True)
         logger.info(f"Successfully loaded {len(combined_logs)} log records from {len(logs)} files")
         
-        # Sort by timestamp
-        combined_logs = combined_logs.sort_values(by='timestamp')
+        # Normalize levels to an upper-case categorical so level filters
+        # compare integer codes instead of strings
+        combined_logs['level'] = _normalize_levels(combined_logs['level'])
+        
+        # Sort by timestamp. Log files are written in time order, so the
+        # concat is a few sorted runs; a stable sort on the int64 timestamps
+        # detects those runs and merges them instead of fully re-sorting.
+        # Ties keep file order. A single file (or files that happen to be in
+        # order end to end) is already sorted and skips the sort entirely
+        if not combined_logs['timestamp'].is_monotonic_increasing:
+            timestamps = combined_logs['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+            combined_logs = combined_logs.take(np.argsort(timestamps, kind='stable'))
         
+        _write_cached_frame(folder_path, 'logs', log_files, combined_logs)
         return combined_logs
         
     except Exception as e:
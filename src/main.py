@@ -17,7 +17,7 @@ import pandas as pd
 
 from data_loader import load_metrics, load_logs
 from anomaly_detector import metric_anomaly, log_warn
-from correlator import correlate
+from correlator import correlate, CORRELATION_COLUMNS
 from root_cause import analyze_root_cause
 
 
@@ -98,7 +98,9 @@ def main() -> None:
         
         # Extract error-level log anomalies
         try:
-            log_anomalies = logs[logs['level'].str.contains('ERROR', case=False, na=False)]
+            # load_logs normalizes levels to an upper-case categorical, so this
+            # is an integer code comparison
+            log_anomalies = logs[logs['level'] == 'ERROR']
             logger.info(f"Found {len(log_anomalies)} error-level log entries")
         except Exception as e:
             logger.error(f"Failed to filter error logs: {str(e)}")
@@ -107,7 +109,7 @@ def main() -> None:
         # Display warnings
         logger.info("Analyzing warning logs...")
         try:
-            warnings_df = log_warn(pd.DataFrame(logs))
+            warnings_df = log_warn(logs)
             if not warnings_df.empty:
                 logger.warning(f"Found {len(warnings_df)} warning entries")
                 print("------------------WARNINGS--------------------")
@@ -140,7 +142,13 @@ def main() -> None:
         # Correlate anomalies
         logger.info("Correlating metric anomalies with log errors...")
         try:
-            correlated = correlate(metric_anomalies, log_anomalies)
+            # Nothing can correlate unless both sides have anomalies, so skip
+            # the join on incident-free runs
+            if metric_anomalies.empty or log_anomalies.empty:
+                logger.info("No candidates for correlation")
+                correlated = pd.DataFrame(columns=CORRELATION_COLUMNS)
+            else:
+                correlated = correlate(metric_anomalies, log_anomalies)
             if not correlated.empty:
                 logger.info(f"Found {len(correlated)} correlated events")
             else:
@@ -19,7 +19,7 @@ from api_service import get_recommendation_with_fallback, get_bulk_recommendatio
 logger = logging.getLogger(__name__)
 
 
-def analyze_root_cause(correlated_df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_root_cause(correlated_df: pd.DataFrame, verbose: bool = True) -> Dict[str, Any]:
     """
     Perform root cause analysis on correlated metric anomalies and log errors.
     
@@ -35,6 +35,7 @@ def analyze_root_cause(correlated_df: pd.DataFrame) -> Dict[str, Any]:
             - metric_value: Value of the metric
             - log_service: Service name from log error
             - log_message: Log message content
+        verbose: Print the rankings and recommendations to stdout
             
     Returns:
         Dict containing root cause analysis results:
@@ -57,7 +58,8 @@ def analyze_root_cause(correlated_df: pd.DataFrame) -> Dict[str, Any]:
     # Handle empty DataFrame
     if correlated_df.empty:
         logger.warning("No correlation data provided - no root cause analysis possible")
-        print('No correlation found')
+        if verbose:
+            print('No correlation found')
         return {
             'service_rankings': pd.DataFrame(columns=['metric_service', 'anomaly_count']),
             'recommendations': {},
@@ -79,54 +81,71 @@ def analyze_root_cause(correlated_df: pd.DataFrame) -> Dict[str, Any]:
     logger.info(f"Analyzing {len(correlated_df)} correlation records for root cause")
     
     try:
-        # Group by service and count anomalies
-        service_rankings = correlated_df.groupby('metric_service').size().reset_index(name='anomaly_count')
-        service_rankings = service_rankings.sort_values(by='anomaly_count', ascending=False)
+        # One groupby pass counts anomalies per service and gathers each
+        # service's first metric name and mean metric value. Services are
+        # ranked by count, with ties broken by service name so the order does
+        # not depend on row or category order
+        service_details = (correlated_df
+                           .groupby('metric_service', sort=False, observed=True)
+                           .agg(anomaly_count=('metric_name', 'size'),
+                                metric_name=('metric_name', 'first'),
+                                metric_value=('metric_value', 'mean'))
+                           .reset_index())
+        service_details['metric_service'] = service_details['metric_service'].astype(str)
+        service_details = (service_details
+                           .sort_values(['anomaly_count', 'metric_service'], ascending=[False, True], kind='stable')
+                           .reset_index(drop=True))
+        service_rankings = service_details[['metric_service', 'anomaly_count']]
         
         logger.info(f"Found anomalies in {len(service_rankings)} services")
         
         # Display root cause analysis results
-        print('------------ROOT CAUSE ANALYSIS-----------------------')
-        print(service_rankings)
+        if verbose:
+            print('------------ROOT CAUSE ANALYSIS-----------------------')
+            print(service_rankings)
         
         # Generate recommendations for each affected service
         service_recommendations = {}
-        print("\nRecommendations by Service:")
+        if verbose:
+            print("\nRecommendations by Service:")
         
         # Prepare data for bulk API call
-        services_data = []
-        for _, row in service_rankings.iterrows():
-            service = row['metric_service']
-            anomaly_count = row['anomaly_count']
-            
-            # Get metric details for this service
-            service_correlations = correlated_df[correlated_df['metric_service'] == service]
-            metric_name = service_correlations['metric_name'].iloc[0] if not service_correlations.empty else None
-            metric_value = service_correlations['metric_value'].mean() if not service_correlations.empty else None
-            
-            services_data.append({
+        services_data = [
+            {
                 'service': service,
                 'anomaly_count': anomaly_count,
                 'metric_name': metric_name,
                 'metric_value': metric_value
-            })
+            }
+            for service, anomaly_count, metric_name, metric_value in service_details[
+                ['metric_service', 'anomaly_count', 'metric_name', 'metric_value']
+            ].itertuples(index=False, name=None)
+        ]
+        
+        # Fetch all recommendations in one bulk call (REST → LLM → local)
+        try:
+            bulk_recommendations = get_bulk_recommendations_with_fallback(services_data)
+        except Exception as e:
+            logger.warning(f"Bulk recommendations failed, fetching per service: {str(e)}")
+            bulk_recommendations = {}
         
-        # Fetch recommendations per service (REST → LLM → local)
         for service_data in services_data:
             service = service_data['service']
             anomaly_count = service_data['anomaly_count']
             try:
-                recommendation = get_recommendation_with_fallback(
-                    service=service,
-                    anomaly_count=anomaly_count,
-                    metric_name=service_data.get('metric_name'),
-                    metric_value=service_data.get('metric_value')
-                )
+                # Services the bulk call did not answer are fetched one by one
+                recommendation = bulk_recommendations.get(service)
+                if not recommendation:
+                    recommendation = get_recommendation_with_fallback(
+                        service=service,
+                        anomaly_count=anomaly_count,
+                        metric_name=service_data.get('metric_name'),
+                        metric_value=service_data.get('metric_value')
+                    )
                 service_recommendations[service] = {
                     'recommendation': recommendation,
                     'anomaly_count': anomaly_count
                 }
-                print(f" - {service.capitalize()}: {recommendation}")
                 logger.info(f"Generated recommendation for {service}: {anomaly_count} anomalies")
             except Exception as e:
                 logger.warning(f"Failed to get recommendation for service '{service}': {str(e)}")
@@ -134,15 +153,21 @@ def analyze_root_cause(correlated_df: pd.DataFrame) -> Dict[str, Any]:
                     'recommendation': "No predefined recommendation available.",
                     'anomaly_count': anomaly_count
                 }
-                print(f" - {service.capitalize()}: No predefined recommendation available.")
         
-        # Generate summary statistics
+        # Print the recommendation lines in one write instead of one per service
+        if verbose and service_recommendations:
+            print("\n".join(f" - {service.capitalize()}: {data['recommendation']}"
+                            for service, data in service_recommendations.items()))
+        
+        # Generate summary statistics. The top-ranked service is the first
+        # entry of services_data, so no row lookup on service_rankings
+        top_service = services_data[0] if services_data else None
         summary_stats = {
             'total_correlations': len(correlated_df),
             'services_affected': len(service_rankings),
-            'metrics_involved': len(correlated_df['metric_name'].unique()),
-            'most_problematic_service': service_rankings.iloc[0]['metric_service'] if not service_rankings.empty else None,
-            'highest_anomaly_count': service_rankings.iloc[0]['anomaly_count'] if not service_rankings.empty else 0
+            'metrics_involved': correlated_df['metric_name'].nunique(dropna=False),
+            'most_problematic_service': top_service['service'] if top_service else None,
+            'highest_anomaly_count': top_service['anomaly_count'] if top_service else 0
         }
         
         logger.info(f"Root cause analysis completed: {summary_stats['services_affected']} services affected, "
@@ -174,21 +199,28 @@ def get_service_impact_summary(correlated_df: pd.DataFrame) -> Dict[str, Any]:
         return {}
     
     try:
-        service_impact = {}
+        # One groupby pass over the correlations instead of re-filtering the
+        # frame for every service; groups keep first-appearance order
+        grouped = correlated_df.groupby('metric_service', sort=False, observed=True)
+        values = grouped['metric_value'].agg(['size', 'mean', 'max'])
+        metrics_affected = grouped['metric_name'].unique()
+        log_services_involved = grouped['log_service'].unique()
+        unique_log_messages = grouped['log_message'].nunique(dropna=False)
         
-        for service in correlated_df['metric_service'].unique():
-            service_data = correlated_df[correlated_df['metric_service'] == service]
-            
-            impact_summary = {
-                'total_anomalies': len(service_data),
-                'metrics_affected': service_data['metric_name'].unique().tolist(),
-                'avg_metric_value': service_data['metric_value'].mean(),
-                'max_metric_value': service_data['metric_value'].max(),
-                'log_services_involved': service_data['log_service'].unique().tolist(),
-                'unique_log_messages': len(service_data['log_message'].unique())
+        service_impact = {
+            service: {
+                'total_anomalies': total,
+                'metrics_affected': list(metrics),
+                'avg_metric_value': avg_value,
+                'max_metric_value': max_value,
+                'log_services_involved': list(log_services),
+                'unique_log_messages': messages
             }
-            
-            service_impact[service] = impact_summary
+            for service, total, avg_value, max_value, metrics, log_services, messages in zip(
+                values.index, values['size'].tolist(), values['mean'].tolist(), values['max'].tolist(),
+                metrics_affected, log_services_involved, unique_log_messages.tolist()
+            )
+        }
             
         logger.info(f"Generated impact summary for {len(service_impact)} services")
         return service_impact
@@ -213,11 +245,11 @@ def prioritize_services(service_rankings: pd.DataFrame, impact_threshold: int =
         return []
     
     try:
-        # Filter services above threshold
-        high_priority = service_rankings[service_rankings['anomaly_count'] >= impact_threshold]
-        
-        # Return service names in priority order
-        priority_list = high_priority['metric_service'].tolist()
+        # Filter services above threshold on the backing arrays (skips the
+        # pandas indexing machinery) and return names in priority order
+        counts = service_rankings['anomaly_count'].to_numpy()
+        names = service_rankings['metric_service'].to_numpy()
+        priority_list = names[counts >= impact_threshold].tolist()
         
         logger.info(f"Identified {len(priority_list)} high-priority services (threshold: {impact_threshold})")
         return priority_list
@@ -227,12 +259,15 @@ def prioritize_services(service_rankings: pd.DataFrame, impact_threshold: int =
         return []
 
 
-def generate_incident_report(correlated_df: pd.DataFrame) -> str:
+def generate_incident_report(correlated_df: pd.DataFrame,
+                             analysis_results: Optional[Dict[str, Any]] = None) -> str:
     """
     Generate a formatted incident report based on root cause analysis.
     
     Args:
         correlated_df: DataFrame containing correlation records
+        analysis_results: Result of an earlier analyze_root_cause(correlated_df)
+            call; when omitted the analysis is run here without printing
         
     Returns:
         String containing formatted incident report
@@ -241,7 +276,8 @@ def generate_incident_report(correlated_df: pd.DataFrame) -> str:
         return "No incidents detected - system operating normally."
     
     try:
-        analysis_results = analyze_root_cause(correlated_df)
+        if analysis_results is None:
+            analysis_results = analyze_root_cause(correlated_df, verbose=False)
         
         report = []
         report.append("=== WAR ROOM AI INCIDENT REPORT ===")
@@ -257,8 +293,9 @@ def generate_incident_report(correlated_df: pd.DataFrame) -> str:
             report.append("")
         
         report.append("SERVICE RANKINGS:")
-        for _, row in analysis_results['service_rankings'].iterrows():
-            report.append(f"  {row['metric_service']}: {row['anomaly_count']} anomalies")
+        rankings = analysis_results['service_rankings'][['metric_service', 'anomaly_count']]
+        for service, anomaly_count in rankings.itertuples(index=False, name=None):
+            report.append(f"  {service}: {anomaly_count} anomalies")
         
         report.append("")
         report.append("RECOMMENDATIONS:")
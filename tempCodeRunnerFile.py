@@ -1,7 +1,18 @@
+import numpy as np
 import pandas as pd
 import glob
 import os
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as feather
+    read_opts = {'engine': 'pyarrow', 'dtype_backend': 'pyarrow'}
+except ImportError:
+    pa = None
+    read_opts = {'engine': 'c'}
 
 
 thresholds = {
@@ -19,11 +30,10 @@ thresholds = {
 
 
 correlation_window = 300
-
-
-metrics_df = pd.read_csv('data/metrics.csv',sep = '\t',header=None, names = ['time_stamp','service','metric_name', 'value'])
-metrics_df['time_stamp'] = pd.to_datetime(metrics_df['time_stamp'], format= '%d-%m-%Y %H:%M')
-metrics_df = metrics_df.sort_values(by='time_stamp', ascending=True)
+base_date = '2025-10-12'
+cache_dir = 'data/.cache'
+# bump when _load changes the frames it returns, so old parquet caches are re-parsed
+_CACHE_VERSION = 1
 
 
 
@@ -32,58 +42,158 @@ metrics_df = metrics_df.sort_values(by='time_stamp', ascending=True)
 
 
 def metric_anamoly(df, thresholds):
-    anamolies = []
-    for _, row in df.iterrows():
-        metric = row['metric_name']
-        value = row['value']
-        service = row['service']
-        if metric in thresholds:
-            threshold = thresholds[metric]
-            if isinstance(threshold,dict):
-                threshold_value = threshold.get(service, None)
-            else:
-                threshold_value = threshold
-            if threshold_value is not None and value > threshold_value:
-                anamolies.append(row)
-    return pd.DataFrame(anamolies)
-
-
-
-
-log_files = glob.glob("data/*.log")
-logs = []
-
-for file in log_files:
-    df = pd.read_csv(file,sep="|", names=['timestamp', 'level', 'message'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'].str.strip(), format='%H:%M:%S', errors='coerce')
-    df['service'] = os.path.basename(file).replace('.log','')
-    logs.append(df)
-
-logs_df = pd.concat(logs, ignore_index=True)
-
-log_anomalies = logs_df[logs_df['level'].str.contains('ERROR', case=False, na=False)]
-print(log_anomalies)
-print("------------------------------------------------------------------------")
-print(metric_anamoly(metrics_df,thresholds))
-metric_anamolies = metric_anamoly(metrics_df,thresholds)
-
-
-
-correlated = []
-
-for _,m_row in metric_anamolies.iterrows():
-    for _, l_row in log_anomalies.iterrows():
-        time_diff = abs((m_row['time_stamp'] - l_row['timestamp']).total_seconds())
-        if time_diff < correlation_window:
-            correlated.append({
-                'timestamp':m_row['time_stamp'],
-                'metric_serrvice':m_row['service'],
-                'metric_name': m_row['metric_name'],
-                'metric_value':m_row['value'],
-                'log_service':l_row['service'],
-                'log_message':l_row['message']
-                })
-            
-correlated_df = pd.DataFrame(correlated)
-
-print(correlated)
+    # threshold per row gathered from a small (metric x service) table indexed
+    # by factorized codes; code -1 (missing) lands on the extra last row/column
+    metric_codes, metrics = pd.factorize(df['metric_name'])
+    service_codes, services = pd.factorize(df['service'])
+    table = np.full((len(metrics) + 1, len(services) + 1), np.nan)
+    for i, metric in enumerate(metrics):
+        thr = thresholds.get(metric)
+        if isinstance(thr, dict):
+            table[i, :-1] = [thr.get(service, np.nan) for service in services]
+        elif thr is not None:
+            table[i] = thr
+    threshold = table[metric_codes, service_codes]
+    return df[df['value'].to_numpy(dtype='float64', na_value=np.nan) > threshold]
+
+
+
+
+def _read_one(path):
+    service_name = os.path.basename(path).removesuffix('.log')
+    df = pd.read_csv(path,sep="|", names=['timestamp', 'level', 'message'], dtype={'timestamp': str}, **read_opts)
+    return df.assign(service=service_name)
+
+
+def _read_logs_arrow(log_files):
+    # all files into one arrow table; timestamps, levels and the per-file
+    # service column are built in arrow before a single to_pandas
+    opts = dict(parse_options=pa_csv.ParseOptions(delimiter='|'),
+                read_options=pa_csv.ReadOptions(column_names=['timestamp', 'level', 'message']),
+                convert_options=pa_csv.ConvertOptions(
+                    # pinned so every file has the same schema for concat_tables,
+                    # e.g. a file whose messages are all numbers is not read as int64
+                    column_types={'timestamp': pa.string(), 'level': pa.string(), 'message': pa.string()},
+                    null_values=[''], strings_can_be_null=True))
+    tables = [pa_csv.read_csv(f, **opts) for f in log_files]
+    table = pa.concat_tables(tables)
+    services = pa.DictionaryArray.from_arrays(
+        np.repeat(np.arange(len(tables), dtype=np.int32), [t.num_rows for t in tables]),
+        [os.path.basename(f).removesuffix('.log') for f in log_files])
+    timestamps = pc.strptime(pc.binary_join_element_wise(base_date + ' ', pc.utf8_trim_whitespace(table['timestamp']), ''),
+                             format='%Y-%m-%d %H:%M:%S', unit='us', error_is_null=True)
+    levels = pc.dictionary_encode(pc.utf8_upper(pc.utf8_trim_whitespace(table['level'])))
+    table = table.set_column(0, 'timestamp', timestamps).set_column(1, 'level', levels).append_column('service', services)
+    return table.to_pandas(types_mapper={pa.string(): pd.ArrowDtype(pa.string())}.get)
+
+
+def _cache_key(log_files):
+    sources = sorted(glob.glob('data/*.csv') + log_files)
+    header = [f'version:{_CACHE_VERSION}', f'base_date:{base_date}']
+    return '\n'.join(header + [f'{f}:{os.path.getmtime(f)}' for f in sources])
+
+
+def _load(log_files):
+    metrics_df = pd.read_csv('data/metrics.csv',sep = '\t',header=None, names = ['time_stamp','service','metric_name', 'value'], dtype={'time_stamp': str}, **read_opts)
+    metrics_df['time_stamp'] = pd.to_datetime(metrics_df['time_stamp'], format= '%d-%m-%Y %H:%M')
+    metrics_df['service'] = metrics_df['service'].astype('category')
+
+    if pa is not None:
+        return metrics_df, _read_logs_arrow(log_files)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(log_files))) as ex:
+        logs = list(ex.map(_read_one, log_files))
+
+    logs_df = pd.concat(logs, ignore_index=True)
+    logs_df['timestamp'] = pd.to_datetime(base_date + ' ' + logs_df['timestamp'].str.strip(), format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    logs_df['level'] = logs_df['level'].str.strip().str.upper().astype('category')
+    logs_df['service'] = logs_df['service'].astype('category')
+    return metrics_df, logs_df
+
+
+def _sort_by(df, col):
+    # stable sort, skipped when the column is already in order
+    return df if df[col].is_monotonic_increasing else df.sort_values(col, kind='stable')
+
+
+def _correlate_window(m, l):
+    # every log strictly inside the window of each metric anomaly, not just the
+    # nearest: with both sides sorted, each metric's logs are one [lo, hi) slice
+    window = np.int64(pd.Timedelta(seconds=correlation_window).value)
+    metric_ts = m['time_stamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    log_ts = l['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    lo = np.searchsorted(log_ts, metric_ts - window, side='right')
+    hi = np.searchsorted(log_ts, metric_ts + window, side='left')
+    counts = np.maximum(hi - lo, 0)
+    # expand the slices into index pairs without a python loop
+    metric_idx = np.repeat(np.arange(len(m)), counts)
+    log_idx = np.arange(counts.sum()) + np.repeat(lo - (np.cumsum(counts) - counts), counts)
+    return pd.concat([m.iloc[metric_idx].reset_index(drop=True), l.iloc[log_idx].reset_index(drop=True)], axis=1)
+
+
+def main():
+    # Parsed frames are cached as parquet and reused while the source files are unchanged
+    log_files = glob.glob("data/*.log")
+    key = _cache_key(log_files)
+    key_file = os.path.join(cache_dir, 'key')
+    metrics_cache = os.path.join(cache_dir, 'metrics.parquet')
+    logs_cache = os.path.join(cache_dir, 'logs.parquet')
+
+    cached_key = None
+    if read_opts['engine'] == 'pyarrow' and os.path.exists(key_file):
+        with open(key_file) as f:
+            cached_key = f.read()
+
+    metrics_df = logs_df = None
+    if cached_key == key:
+        try:
+            metrics_df = pd.read_parquet(metrics_cache, engine='pyarrow')
+            logs_df = pd.read_parquet(logs_cache, engine='pyarrow')
+        except (OSError, ValueError):
+            # missing or truncated cache files: parse the sources again
+            metrics_df = logs_df = None
+
+    if metrics_df is None:
+        metrics_df, logs_df = _load(log_files)
+        if read_opts['engine'] == 'pyarrow':
+            os.makedirs(cache_dir, exist_ok=True)
+            metrics_df.to_parquet(metrics_cache, engine='pyarrow', compression='zstd')
+            logs_df.to_parquet(logs_cache, engine='pyarrow', compression='zstd')
+            with open(key_file, 'w') as f:
+                f.write(key)
+
+    log_anomalies = logs_df[logs_df['level'] == 'ERROR']
+    print(log_anomalies)
+    print("------------------------------------------------------------------------")
+    # only the anomaly rows are sorted by time, not all of metrics_df
+    metric_anamolies = _sort_by(metric_anamoly(metrics_df, thresholds), 'time_stamp')
+    print(metric_anamolies)
+
+    # Keep only the columns the correlation output uses
+    m = metric_anamolies[['time_stamp', 'service', 'metric_name', 'value']].rename(
+        columns={'service': 'metric_service', 'value': 'metric_value'})
+    l = log_anomalies[['timestamp', 'service', 'message']].rename(
+        columns={'service': 'log_service', 'message': 'log_message'})
+
+    # the window join needs both sides sorted by time; m already is
+    l = _sort_by(l.dropna(subset=['timestamp']), 'timestamp')
+    merged = _correlate_window(m, l)
+
+    correlated_df = (merged.drop(columns='timestamp')
+                     .rename(columns={'time_stamp': 'timestamp'})
+                     .reset_index(drop=True)
+                     .astype({'metric_service': 'category', 'log_service': 'category'}))
+
+    print(correlated_df)
+
+    # hand the result on as arrow: the categorical service columns are written
+    # as dictionary arrays, so readers get int codes instead of repeated strings
+    if pa is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        feather.write_feather(correlated_df, os.path.join(cache_dir, 'correlated.feather'), compression='lz4')
+
+    return metrics_df, logs_df, metric_anamolies, log_anomalies, correlated_df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Tests for the War_RoomAI API service module.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import api_service  # noqa: E402
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ClockedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(api_service.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class CircuitBreakerTest(ClockedTestCase):
+    """Closed -> open after consecutive failures -> half-open probe -> closed/open."""
+
+    def setUp(self):
+        super().setUp()
+        self.breaker = api_service._CircuitBreaker(fail_threshold=3, open_seconds=30)
+
+    def _trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_stays_closed_below_threshold(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        self.assertFalse(self.breaker.is_open())
+        self.assertTrue(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        self.assertFalse(self.breaker.is_open())
+
+    def test_opens_at_threshold_and_fails_fast(self):
+        self._trip()
+
+        self.assertTrue(self.breaker.is_open())
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_admits_a_single_probe(self):
+        self._trip()
+        self.clock.advance(30)
+
+        self.assertFalse(self.breaker.is_open())
+        self.assertTrue(self.breaker.allow())
+        # Concurrent callers keep failing fast while the probe is in flight
+        self.assertFalse(self.breaker.allow())
+        self.assertTrue(self.breaker.is_open())
+
+    def test_successful_probe_closes_the_circuit(self):
+        self._trip()
+        self.clock.advance(30)
+        self.breaker.allow()
+        self.breaker.record_success()
+
+        self.assertFalse(self.breaker.is_open())
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens_the_circuit(self):
+        self._trip()
+        self.clock.advance(30)
+        self.breaker.allow()
+        self.clock.advance(5)
+        self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.is_open())
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(1)
+        self.assertTrue(self.breaker.allow())
+
+
+class TTLCacheTest(ClockedTestCase):
+    """Entries expire after their TTL and the least recently used is evicted first."""
+
+    def test_entry_expires_after_ttl(self):
+        cache = api_service._TTLCache(maxsize=4, ttl=10, negative_ttl=2)
+        cache.set('a', 'rec')
+
+        self.clock.advance(9)
+        self.assertEqual(cache.get('a'), (True, 'rec'))
+        self.clock.advance(1)
+        self.assertEqual(cache.get('a'), (False, None))
+
+    def test_negative_result_uses_shorter_ttl(self):
+        cache = api_service._TTLCache(maxsize=4, ttl=10, negative_ttl=2)
+        cache.set('a', None)
+
+        self.clock.advance(1)
+        self.assertEqual(cache.get('a'), (True, None))
+        self.clock.advance(1)
+        self.assertEqual(cache.get('a'), (False, None))
+
+    def test_zero_ttl_disables_caching(self):
+        cache = api_service._TTLCache(maxsize=4, ttl=10, negative_ttl=0)
+        cache.set('a', None)
+
+        self.assertEqual(cache.get('a'), (False, None))
+
+    def test_evicts_least_recently_used(self):
+        cache = api_service._TTLCache(maxsize=2, ttl=10, negative_ttl=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), (True, 1))
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('c'), (True, 3))
+
+
+class SimilarContextCacheTest(ClockedTestCase):
+    """Responses are reused for the same service and metric within the tolerance."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = api_service._SimilarContextCache(ttl=30, tolerance=0.05, maxsize=8, per_service=4)
+
+    @staticmethod
+    def _context(value, service='api', metric_name='latency_ms'):
+        return {'service': service, 'metric_name': metric_name, 'metric_value': value}
+
+    def test_value_within_tolerance_matches(self):
+        self.cache.add(self._context(352.0), 'scale api')
+
+        self.assertEqual(self.cache.get(self._context(358.0)), 'scale api')
+        self.assertIsNone(self.cache.get(self._context(380.0)))
+
+    def test_service_and_metric_must_match(self):
+        self.cache.add(self._context(352.0), 'scale api')
+
+        self.assertIsNone(self.cache.get(self._context(352.0, service='database')))
+        self.assertIsNone(self.cache.get(self._context(352.0, metric_name='cpu_pct')))
+
+    def test_closest_value_wins(self):
+        self.cache.add(self._context(340.0), 'far')
+        self.cache.add(self._context(356.0), 'near')
+
+        self.assertEqual(self.cache.get(self._context(352.0)), 'near')
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.add(self._context(352.0), 'scale api')
+        self.clock.advance(30)
+
+        self.assertIsNone(self.cache.get(self._context(352.0)))
+        self.assertNotIn('api', self.cache._entries)
+
+    def test_total_size_is_bounded(self):
+        for i in range(20):
+            self.cache.add(self._context(float(i * 100), service=f's{i % 5}'), f'r{i}')
+
+        self.assertLessEqual(sum(map(len, self.cache._entries.values())), 8)
+        self.assertEqual(self.cache.get(self._context(1900.0, service='s4')), 'r19')
+
+
+class BackoffDelayTest(unittest.TestCase):
+    """Jittered exponential backoff capped at retry_cap, Retry-After included."""
+
+    def setUp(self):
+        self.client = api_service.RecommendationsAPI()
+        self.client.retry_delay = 1
+        self.client.retry_cap = 10
+
+    def test_backoff_grows_exponentially_up_to_the_cap(self):
+        with mock.patch.object(api_service.random, 'uniform', lambda low, high: high):
+            delays = [self.client._backoff_delay(attempt) for attempt in range(6)]
+
+        self.assertEqual(delays, [1, 2, 4, 8, 10, 10])
+
+    def test_retry_after_sets_a_floor(self):
+        with mock.patch.object(api_service.random, 'uniform', lambda low, high: low):
+            self.assertEqual(self.client._backoff_delay(0, retry_after=3), 3)
+
+    def test_retry_after_is_clamped_to_the_cap(self):
+        with mock.patch.object(api_service.random, 'uniform', lambda low, high: low):
+            self.assertEqual(self.client._backoff_delay(0, retry_after=3600), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
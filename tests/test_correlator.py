@@ -0,0 +1,111 @@
+"""
+Tests for the War_RoomAI correlator module.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correlator  # noqa: E402
+from config import correlation_window  # noqa: E402
+
+SECOND = 10 ** 9
+
+
+def nested_window_join(metric_ts, log_ts, window):
+    """Reference join: every (metric, log) pair at most window apart, metric-major."""
+    pairs = [(m, l) for m in range(len(metric_ts)) for l in range(len(log_ts))
+             if abs(int(metric_ts[m]) - int(log_ts[l])) <= window]
+    metric_idx = np.array([m for m, _ in pairs], dtype=np.int64)
+    log_idx = np.array([l for _, l in pairs], dtype=np.int64)
+    return metric_idx, log_idx
+
+
+class CorrelateKernelTest(unittest.TestCase):
+    """The searchsorted window join returns the same pairs as the nested-loop join."""
+
+    def assertMatchesNestedJoin(self, metric_seconds, log_seconds, window_seconds=5):
+        metric_ts = np.array(metric_seconds, dtype=np.int64) * SECOND
+        log_ts = np.array(log_seconds, dtype=np.int64) * SECOND
+        window = window_seconds * SECOND
+
+        metric_idx, log_idx, time_diff = correlator._correlate_kernel(metric_ts, log_ts, window)
+        expected_metric_idx, expected_log_idx = nested_window_join(metric_ts, log_ts, window)
+
+        np.testing.assert_array_equal(metric_idx, expected_metric_idx)
+        np.testing.assert_array_equal(log_idx, expected_log_idx)
+        np.testing.assert_array_equal(time_diff, np.abs(metric_ts[metric_idx] - log_ts[log_idx]) / 1e9)
+
+    def test_window_edges_are_inclusive(self):
+        self.assertMatchesNestedJoin([100], [94, 95, 100, 105, 106])
+
+    def test_duplicate_timestamps(self):
+        self.assertMatchesNestedJoin([100, 100, 103], [100, 100, 98, 105, 105])
+
+    def test_unsorted_logs_keep_input_order(self):
+        self.assertMatchesNestedJoin([10, 0, 20], [22, 3, 11, 0, 9, 18, 3])
+
+    def test_no_matches(self):
+        self.assertMatchesNestedJoin([0, 100], [50])
+
+    def test_empty_inputs(self):
+        self.assertMatchesNestedJoin([], [1, 2])
+        self.assertMatchesNestedJoin([1, 2], [])
+        self.assertMatchesNestedJoin([], [])
+
+    def test_random_timestamps(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            self.assertMatchesNestedJoin(rng.integers(0, 60, 15), rng.integers(0, 60, 25))
+
+
+class CorrelateTest(unittest.TestCase):
+    """correlate() builds the same records as the baseline nested-window join."""
+
+    def setUp(self):
+        correlator._correlation_cache.clear()
+
+    def test_records_match_nested_join(self):
+        base = pd.Timestamp('2025-10-12 12:00:00')
+        window = pd.Timedelta(seconds=correlation_window)
+        metrics = pd.DataFrame({
+            'time_stamp': [base, base + window, pd.NaT, base],
+            'service': ['api', 'database', 'api', 'frontend'],
+            'metric_name': ['latency_ms', 'cpu_pct', 'cpu_pct', 'latency_ms'],
+            'value': [400.0, 95.0, 99.0, 380.0],
+        })
+        logs = pd.DataFrame({
+            'timestamp': [base + 2 * window, base - window, base, pd.NaT, base + window],
+            'service': ['database', 'api', 'frontend', 'api', 'api'],
+            'message': ['db down', 'api timeout', 'fe error', 'no time', 'api retry'],
+        })
+
+        result = correlator.correlate(metrics, logs)
+
+        expected = [
+            (m.time_stamp, m.service, m.metric_name, m.value, l.service, l.message)
+            for m in metrics.itertuples() if pd.notna(m.time_stamp)
+            for l in logs.itertuples()
+            if pd.notna(l.timestamp) and abs(m.time_stamp - l.timestamp) <= window
+        ]
+        actual = list(zip(result['timestamp'], result['metric_service'].astype(str), result['metric_name'],
+                          result['metric_value'], result['log_service'].astype(str), result['log_message']))
+        self.assertEqual(actual, expected)
+
+    def test_empty_inputs_return_empty_frame(self):
+        metrics = pd.DataFrame({'time_stamp': [pd.Timestamp('2025-10-12')], 'service': ['api'],
+                                'metric_name': ['cpu_pct'], 'value': [95.0]})
+        logs = pd.DataFrame({'timestamp': [pd.Timestamp('2025-10-12')], 'service': ['api'], 'message': ['x']})
+
+        for result in (correlator.correlate(metrics.head(0), logs), correlator.correlate(metrics, logs.head(0))):
+            self.assertTrue(result.empty)
+            self.assertEqual(tuple(result.columns), correlator.CORRELATION_COLUMNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
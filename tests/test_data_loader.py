@@ -0,0 +1,85 @@
+"""
+Tests for the War_RoomAI data loader module.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import data_loader  # noqa: E402
+
+
+# Second row is truncated (no value column)
+MALFORMED_METRICS = (
+    "12-10-2025 12:00\tdatabase\tcpu_pct\t25\n"
+    "12-10-2025 12:05\tdatabase\tcpu_pct\n"
+    "12-10-2025 12:06\tapi\tlatency_ms\t76\n"
+)
+
+# Second row is truncated (no message column)
+MALFORMED_LOG = (
+    "12:00:00 | INFO  | Api running normally\n"
+    "12:00:01 | ERROR\n"
+    "12:00:02 | ERROR | Api Error: timeout\n"
+)
+
+
+class MalformedInputTest(unittest.TestCase):
+    """Ragged rows parse as the C engine parses them, whichever engine is used."""
+
+    def setUp(self):
+        self._cache_enabled = data_loader._CACHE_ENABLED
+        data_loader._CACHE_ENABLED = False
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        data_loader._CACHE_ENABLED = self._cache_enabled
+        shutil.rmtree(self.data_dir)
+
+    def _write(self, name, text):
+        path = os.path.join(self.data_dir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_truncated_metric_row_is_dropped(self):
+        df = data_loader.load_metrics(self._write('metrics.csv', MALFORMED_METRICS))
+
+        self.assertEqual(df['service'].tolist(), ['database', 'api'])
+        self.assertEqual(df['value'].tolist(), [25.0, 76.0])
+
+    def test_truncated_log_row_is_kept_by_pandas_reader(self):
+        df = data_loader._read_log_file_pandas(self._write('api.log', MALFORMED_LOG), '2025-10-12 ')
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df['level'].str.strip().tolist(), ['INFO', 'ERROR', 'ERROR'])
+        self.assertTrue(pd.isna(df['message'].iloc[1]))
+
+    def test_truncated_log_row_keeps_the_rest_of_the_file(self):
+        self._write('api.log', MALFORMED_LOG)
+        self._write('database.log', "12:00:00 | ERROR | Database Error: deadlock\n")
+
+        df = data_loader.load_logs(self.data_dir)
+
+        api = df[df['service'] == 'api']
+        self.assertEqual(api['level'].tolist(), ['INFO', 'ERROR', 'ERROR'])
+        self.assertTrue(pd.isna(api['message'].iloc[1]))
+        self.assertEqual(df[df['service'] == 'database']['message'].tolist(), ['Database Error: deadlock'])
+
+    def test_long_log_row_skips_the_file_as_before(self):
+        self._write('api.log', "12:00:00 | ERROR | a | b\n")
+        self._write('database.log', "12:00:00 | ERROR | Database Error: deadlock\n")
+
+        df = data_loader.load_logs(self.data_dir)
+
+        self.assertEqual(df['service'].tolist(), ['database'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for the War_RoomAI root cause analysis module.
+"""
+
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import root_cause  # noqa: E402
+
+
+class ServiceRankingTieOrderTest(unittest.TestCase):
+    """Services with equal anomaly counts rank by service name."""
+    
+    def setUp(self):
+        self._bulk = root_cause.get_bulk_recommendations_with_fallback
+        root_cause.get_bulk_recommendations_with_fallback = (
+            lambda services_data: {item['service']: 'rec' for item in services_data}
+        )
+    
+    def tearDown(self):
+        root_cause.get_bulk_recommendations_with_fallback = self._bulk
+    
+    def _correlations(self, services):
+        # Categories in first-appearance order, as correlate() returns them
+        return pd.DataFrame({
+            'timestamp': pd.Timestamp('2025-10-12 12:00'),
+            'metric_service': pd.Categorical(services, categories=list(dict.fromkeys(services))),
+            'metric_name': 'cpu_pct',
+            'metric_value': 100.0,
+            'log_service': 'api',
+            'log_message': 'error'
+        })
+    
+    def test_ties_rank_by_service_name(self):
+        df = self._correlations(['api', 'frontend', 'database', 'api', 'frontend', 'database', 'api'])
+        result = root_cause.analyze_root_cause(df, verbose=False)
+        
+        rankings = result['service_rankings']
+        self.assertEqual(rankings['metric_service'].tolist(), ['api', 'database', 'frontend'])
+        self.assertEqual(rankings['anomaly_count'].tolist(), [3, 2, 2])
+        self.assertEqual(list(result['recommendations']), ['api', 'database', 'frontend'])
+        self.assertEqual(root_cause.prioritize_services(rankings), ['api', 'database', 'frontend'])
+    
+    def test_incident_report_lists_ties_by_service_name(self):
+        df = self._correlations(['frontend', 'database'])
+        report = root_cause.generate_incident_report(df)
+        
+        self.assertLess(report.index('  database: 1 anomalies'), report.index('  frontend: 1 anomalies'))
+
+
+if __name__ == '__main__':
+    unittest.main()